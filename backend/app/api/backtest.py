@@ -1,146 +1,286 @@
 """Backtest API routes."""
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi.concurrency import iterate_in_threadpool, run_in_threadpool
+from fastapi.responses import StreamingResponse
+from fastapi_cache import FastAPICache
+from fastapi_cache.decorator import cache
+from sqlalchemy import and_, case, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
-from app.database import get_db
-from app.models import BacktestResult, Gameweek, PlayerGWStats, PredictionPlayer
+from app.database import SessionLocal, get_async_db, get_db, loader_options
+from app.models import (
+    BacktestResult,
+    Gameweek,
+    PlayerGWStats,
+    Prediction,
+    PredictionPlayer,
+)
 from app.schemas import BacktestResultSchema, BacktestSummarySchema
+from app.services.backtest import (
+    BacktestSummaryAccumulator,
+    iter_backtest,
+    run_backtest as run_bt,
+    summarize_results,
+)
+from app.services.predictor import ModelType
 
 router = APIRouter()
 
+# Cache namespace for summary responses, cleared whenever a backtest runs
+SUMMARY_CACHE_NAMESPACE = "backtest"
+SUMMARY_CACHE_EXPIRE_SECONDS = 60
 
-def _compute_predicted_team_actual(
-    db: Session, prediction_id: int, gameweek_id: int
-) -> int | None:
-    """Compute the actual points scored by the predicted team."""
-    pred_players = (
-        db.query(PredictionPlayer)
-        .filter(PredictionPlayer.prediction_id == prediction_id)
-        .all()
-    )
-    if not pred_players:
-        return None
 
-    total = 0
-    for pp in pred_players:
-        stats = (
-            db.query(PlayerGWStats)
-            .filter(
-                PlayerGWStats.player_id == pp.player_id,
-                PlayerGWStats.gameweek_id == gameweek_id,
+def _predicted_team_actual_column():
+    """
+    Correlated subquery of actual points scored by a backtest's predicted team.
+
+    Evaluates to NULL when the prediction has no players, and counts players
+    without stats for the gameweek as zero.
+    """
+    return (
+        select(
+            case(
+                (
+                    func.count(PredictionPlayer.id) > 0,
+                    func.coalesce(func.sum(PlayerGWStats.total_points), 0),
+                ),
             )
-            .first()
         )
-        if stats:
-            total += stats.total_points
-    return total
+        .select_from(PredictionPlayer)
+        .outerjoin(
+            PlayerGWStats,
+            and_(
+                PlayerGWStats.player_id == PredictionPlayer.player_id,
+                PlayerGWStats.gameweek_id == BacktestResult.gameweek_id,
+            ),
+        )
+        .where(PredictionPlayer.prediction_id == BacktestResult.prediction_id)
+        .correlate(BacktestResult)
+        .scalar_subquery()
+    )
 
 
-@router.get("/summary", response_model=BacktestSummarySchema)
-def get_backtest_summary(db: Session = Depends(get_db)) -> BacktestSummarySchema:
-    """Get summary of all backtest results."""
-    results = (
-        db.query(BacktestResult)
-        .join(Gameweek)
-        .order_by(Gameweek.fpl_id)
-        .all()
+def _predicted_team_actuals_query():
+    """
+    Build a statement of actual points scored by each predicted team.
+
+    Each prediction is matched to its own gameweek through the backtest result
+    row, so the sum is grouped per prediction rather than per gameweek.
+    Predictions without any players produce no row.
+    """
+    return (
+        select(
+            PredictionPlayer.prediction_id.label("prediction_id"),
+            func.coalesce(func.sum(PlayerGWStats.total_points), 0).label("total"),
+        )
+        .join(
+            BacktestResult,
+            BacktestResult.prediction_id == PredictionPlayer.prediction_id,
+        )
+        .outerjoin(
+            PlayerGWStats,
+            and_(
+                PlayerGWStats.player_id == PredictionPlayer.player_id,
+                PlayerGWStats.gameweek_id == BacktestResult.gameweek_id,
+            ),
+        )
+        .group_by(PredictionPlayer.prediction_id)
+    )
+
+
+async def _compute_predicted_team_actuals(
+    db: AsyncSession, results: list[BacktestResult]
+) -> dict[int, int]:
+    """
+    Compute the actual points scored by each predicted team in one query.
+
+    Expects prediction players to be eager-loaded on the results. Stats for
+    every (player, gameweek) pair are fetched in a single batch and summed
+    in memory; predictions without players are left out.
+    """
+    pairs = {
+        (pp.player_id, r.gameweek_id)
+        for r in results
+        for pp in r.prediction.players
+    }
+    if not pairs:
+        return {}
+
+    rows = await db.execute(
+        select(
+            PlayerGWStats.player_id,
+            PlayerGWStats.gameweek_id,
+            PlayerGWStats.total_points,
+        ).where(
+            tuple_(PlayerGWStats.player_id, PlayerGWStats.gameweek_id).in_(pairs)
+        )
     )
+    points = {(player_id, gw_id): pts for player_id, gw_id, pts in rows}
 
-    if not results:
-        return BacktestSummarySchema(
-            total_gameweeks=0,
-            avg_overlap=0.0,
-            avg_points_ratio=0.0,
-            avg_predicted_team_actual=None,
-            avg_dream_team_points=None,
-            min_overlap=0,
-            max_overlap=0,
-            weeks_above_9=0,
-            weeks_above_8=0,
-            results=[],
+    return {
+        r.prediction_id: sum(
+            points.get((pp.player_id, r.gameweek_id), 0) for pp in r.prediction.players
         )
+        for r in results
+        if r.prediction.players
+    }
 
-    overlaps = [r.player_overlap for r in results]
-    ratios = [float(r.points_ratio) for r in results]
-    dream_team_points = [r.actual_total for r in results]
 
-    # Compute predicted_team_actual for each result
-    result_schemas = []
-    predicted_team_actuals = []
-    for r in results:
-        pta = _compute_predicted_team_actual(db, r.prediction_id, r.gameweek_id)
-        if pta is not None:
-            predicted_team_actuals.append(pta)
-        result_schemas.append(
-            BacktestResultSchema(
-                gameweek_id=r.gameweek_id,
-                gameweek_fpl_id=r.gameweek.fpl_id,
-                player_overlap=r.player_overlap,
-                points_ratio=float(r.points_ratio),
-                actual_total=r.actual_total,
-                predicted_total=r.predicted_total,
-                predicted_team_actual=pta,
-                created_at=r.created_at,
+async def _aggregate_backtest_summary(db: AsyncSession) -> BacktestSummarySchema:
+    """Compute summary statistics in a single SQL round-trip, without results."""
+    team_actuals = _predicted_team_actuals_query().subquery()
+    (
+        total_gameweeks,
+        avg_overlap,
+        avg_points_ratio,
+        avg_dream_team_points,
+        min_overlap,
+        max_overlap,
+        weeks_above_9,
+        weeks_above_8,
+        avg_predicted_team_actual,
+    ) = (
+        await db.execute(
+            select(
+                func.count(BacktestResult.id),
+                func.avg(BacktestResult.player_overlap),
+                func.avg(BacktestResult.points_ratio),
+                func.avg(BacktestResult.actual_total),
+                func.min(BacktestResult.player_overlap),
+                func.max(BacktestResult.player_overlap),
+                func.sum(case((BacktestResult.player_overlap >= 9, 1), else_=0)),
+                func.sum(case((BacktestResult.player_overlap >= 8, 1), else_=0)),
+                select(func.avg(team_actuals.c.total)).scalar_subquery(),
             )
         )
+    ).one()
+
+    if not total_gameweeks:
+        return summarize_results([])
 
     return BacktestSummarySchema(
-        total_gameweeks=len(results),
-        avg_overlap=sum(overlaps) / len(overlaps),
-        avg_points_ratio=sum(ratios) / len(ratios),
+        total_gameweeks=total_gameweeks,
+        avg_overlap=float(avg_overlap),
+        avg_points_ratio=float(avg_points_ratio),
         avg_predicted_team_actual=(
-            sum(predicted_team_actuals) / len(predicted_team_actuals)
-            if predicted_team_actuals
+            float(avg_predicted_team_actual)
+            if avg_predicted_team_actual is not None
             else None
         ),
-        avg_dream_team_points=(
-            sum(dream_team_points) / len(dream_team_points)
-            if dream_team_points
-            else None
-        ),
-        min_overlap=min(overlaps),
-        max_overlap=max(overlaps),
-        weeks_above_9=sum(1 for o in overlaps if o >= 9),
-        weeks_above_8=sum(1 for o in overlaps if o >= 8),
-        results=result_schemas,
+        avg_dream_team_points=float(avg_dream_team_points),
+        min_overlap=min_overlap,
+        max_overlap=max_overlap,
+        weeks_above_9=weeks_above_9,
+        weeks_above_8=weeks_above_8,
+        results=[],
+    )
+
+
+async def _summary_cache_key(
+    endpoint, namespace: str, *, request=None, response=None, args=(), kwargs=None
+) -> str:
+    """
+    Build the summary cache key from the latest backtest result.
+
+    Any new backtest row changes max(id)/max(created_at), so a new run is
+    never answered from a stale entry even before it expires.
+    """
+    db: AsyncSession = kwargs["db"]
+    max_id, max_created_at = (
+        await db.execute(
+            select(func.max(BacktestResult.id), func.max(BacktestResult.created_at))
+        )
+    ).one()
+    return (
+        f"{namespace}:summary:{kwargs['include_results']}:{max_id}:{max_created_at}"
     )
 
 
+@router.get("/summary", response_model=BacktestSummarySchema)
+@cache(
+    expire=SUMMARY_CACHE_EXPIRE_SECONDS,
+    key_builder=_summary_cache_key,
+    namespace=SUMMARY_CACHE_NAMESPACE,
+)
+async def get_backtest_summary(
+    include_results: bool = Query(
+        True, description="Include per-gameweek results (aggregates only if false)"
+    ),
+    db: AsyncSession = Depends(get_async_db),
+) -> BacktestSummarySchema:
+    """Get summary of all backtest results."""
+    if not include_results:
+        return await _aggregate_backtest_summary(db)
+
+    results = (
+        (
+            await db.execute(
+                select(BacktestResult)
+                .options(
+                    *loader_options(
+                        selectinload(BacktestResult.prediction).selectinload(
+                            Prediction.players
+                        ),
+                    )
+                )
+                .order_by(BacktestResult.gameweek_fpl_id)
+            )
+        )
+        .scalars()
+        .all()
+    )
+
+    # Compute predicted_team_actual for all results in a single query
+    team_actuals = await _compute_predicted_team_actuals(db, results)
+    result_schemas = []
+    for r in results:
+        schema = BacktestResultSchema.model_validate(r)
+        schema.predicted_team_actual = team_actuals.get(r.prediction_id)
+        result_schemas.append(schema)
+
+    return summarize_results(result_schemas)
+
+
 @router.get("/{gw_id}", response_model=BacktestResultSchema | None)
 def get_backtest_result(
     gw_id: int, db: Session = Depends(get_db)
 ) -> BacktestResultSchema | None:
     """Get backtest result for a specific gameweek."""
-    gw = db.query(Gameweek).filter(Gameweek.fpl_id == gw_id).first()
-    if not gw:
+    # Outer join so a missing gameweek (404) is distinguishable from no result
+    row = db.execute(
+        select(
+            Gameweek.id,
+            BacktestResult,
+            _predicted_team_actual_column().label("predicted_team_actual"),
+        )
+        .select_from(Gameweek)
+        .outerjoin(BacktestResult, BacktestResult.gameweek_id == Gameweek.id)
+        .where(Gameweek.fpl_id == gw_id)
+        .limit(1)
+    ).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Gameweek not found")
 
-    result = db.query(BacktestResult).filter(BacktestResult.gameweek_id == gw.id).first()
+    _, result, predicted_team_actual = row
     if not result:
         return None
 
-    # Compute actual points scored by our predicted team
-    predicted_team_actual = _compute_predicted_team_actual(
-        db, result.prediction_id, result.gameweek_id
-    )
-
-    return BacktestResultSchema(
-        gameweek_id=result.gameweek_id,
-        gameweek_fpl_id=gw.fpl_id,
-        player_overlap=result.player_overlap,
-        points_ratio=float(result.points_ratio),
-        actual_total=result.actual_total,
-        predicted_total=result.predicted_total,
-        predicted_team_actual=predicted_team_actual,
-        created_at=result.created_at,
-    )
+    schema = BacktestResultSchema.model_validate(result)
+    schema.predicted_team_actual = predicted_team_actual
+    return schema
 
 
 @router.post("/run")
-def run_backtest(
+async def run_backtest(
     start_gw: int = Query(6, description="Start gameweek (min 6 for enough history)"),
     end_gw: int | None = Query(None, description="End gameweek (defaults to last finished)"),
+    model_type: ModelType = Query("ensemble", description="Model to backtest"),
+    force_regenerate: bool = Query(
+        False, description="Regenerate predictions even if they exist"
+    ),
     db: Session = Depends(get_db),
 ) -> BacktestSummarySchema:
     """
@@ -149,7 +289,43 @@ def run_backtest(
     This trains the model on data before each GW and predicts that GW,
     then compares to the actual dream team.
     """
-    from app.services.backtest import run_backtest as run_bt
+    summary = await run_in_threadpool(
+        run_bt, db, start_gw, end_gw, model_type, force_regenerate
+    )
 
-    summary = run_bt(db, start_gw, end_gw)
+    # Existing rows may have been updated in place, which the cache key misses
+    await FastAPICache.clear(namespace=SUMMARY_CACHE_NAMESPACE)
     return summary
+
+
+@router.post("/run/stream")
+async def stream_backtest(
+    start_gw: int = Query(6, description="Start gameweek (min 6 for enough history)"),
+    end_gw: int | None = Query(None, description="End gameweek (defaults to last finished)"),
+    model_type: ModelType = Query("ensemble", description="Model to backtest"),
+    force_regenerate: bool = Query(
+        False, description="Regenerate predictions even if they exist"
+    ),
+) -> StreamingResponse:
+    """
+    Run backtest across gameweeks, streaming results as NDJSON.
+
+    Emits one BacktestResultSchema line per gameweek as soon as it is scored,
+    then a final BacktestSummarySchema line (without per-gameweek results).
+    """
+    async def lines():
+        # The request-scoped session is closed before a streamed body is sent
+        db = SessionLocal()
+        try:
+            summary = BacktestSummaryAccumulator()
+            backtest = iter_backtest(db, start_gw, end_gw, model_type, force_regenerate)
+            async for raw in iterate_in_threadpool(backtest):
+                result = BacktestResultSchema.model_validate(raw)
+                summary.add(result)
+                yield result.model_dump_json() + "\n"
+            yield summary.summary().model_dump_json() + "\n"
+        finally:
+            db.close()
+        await FastAPICache.clear(namespace=SUMMARY_CACHE_NAMESPACE)
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
@@ -0,0 +1,26 @@
+"""Conditional GET helpers for API routes."""
+
+import hashlib
+
+from fastapi import Request, Response
+
+
+def check_etag(request: Request, response: Response, *version) -> Response | None:
+    """
+    Apply a weak ETag derived from a version stamp.
+
+    Args:
+        request: Incoming request (read for If-None-Match)
+        response: Outgoing response (ETag header is set on it)
+        *version: Cheap values that change whenever the payload changes,
+            e.g. max(id) and count(*) of the rows the endpoint serializes
+
+    Returns:
+        A 304 response if the client already has this version, otherwise None
+    """
+    digest = hashlib.sha1(repr(version).encode()).hexdigest()
+    etag = f'W/"{digest}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return None
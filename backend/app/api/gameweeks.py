@@ -1,26 +1,67 @@
 """Gameweek API routes."""
 
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import bindparam, func, lambda_stmt, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import get_async_db, get_db
 from app.models import Gameweek
 from app.schemas import GameweekSchema
 
 router = APIRouter()
 
+# Hot single-row lookups as lambda statements, so construction and compilation
+# are cached per statement rather than redone on every request
+_CURRENT_GAMEWEEK = lambda_stmt(
+    lambda: select(Gameweek).where(Gameweek.is_current == True).limit(1)  # noqa: E712
+)
+_NEXT_GAMEWEEK = lambda_stmt(
+    lambda: select(Gameweek).where(Gameweek.is_next == True).limit(1)  # noqa: E712
+)
+_GAMEWEEK_BY_FPL_ID = lambda_stmt(
+    lambda: select(Gameweek).where(Gameweek.fpl_id == bindparam("fpl_id"))
+)
+
+# Validated gameweek list keyed on (max(updated_at), count) of the table
+_gameweek_list_cache: dict[tuple, tuple[GameweekSchema, ...]] = {}
+
+
+def clear_gameweek_cache() -> None:
+    """Drop the cached gameweek list (call after writing gameweeks)."""
+    _gameweek_list_cache.clear()
+
 
 @router.get("", response_model=list[GameweekSchema])
-def list_gameweeks(db: Session = Depends(get_db)) -> list[GameweekSchema]:
+async def list_gameweeks(
+    db: AsyncSession = Depends(get_async_db),
+) -> list[GameweekSchema]:
     """Get all gameweeks."""
-    gameweeks = db.query(Gameweek).order_by(Gameweek.fpl_id).all()
-    return [GameweekSchema.model_validate(gw) for gw in gameweeks]
+    version_key = tuple(
+        (
+            await db.execute(
+                select(func.max(Gameweek.updated_at), func.count(Gameweek.id))
+            )
+        ).one()
+    )
+    cached = _gameweek_list_cache.get(version_key)
+    if cached is None:
+        gameweeks = (
+            (await db.execute(select(Gameweek).order_by(Gameweek.fpl_id)))
+            .scalars()
+            .all()
+        )
+        cached = tuple(GameweekSchema.model_validate(gw) for gw in gameweeks)
+        # Only the latest version is ever requested again
+        _gameweek_list_cache.clear()
+        _gameweek_list_cache[version_key] = cached
+    return list(cached)
 
 
 @router.get("/current", response_model=GameweekSchema | None)
 def get_current_gameweek(db: Session = Depends(get_db)) -> GameweekSchema | None:
     """Get the current gameweek."""
-    gw = db.query(Gameweek).filter(Gameweek.is_current == True).first()  # noqa: E712
+    gw = db.execute(_CURRENT_GAMEWEEK).scalars().first()
     if not gw:
         return None
     return GameweekSchema.model_validate(gw)
@@ -29,7 +70,7 @@ def get_current_gameweek(db: Session = Depends(get_db)) -> GameweekSchema | None
 @router.get("/next", response_model=GameweekSchema | None)
 def get_next_gameweek(db: Session = Depends(get_db)) -> GameweekSchema | None:
     """Get the next gameweek."""
-    gw = db.query(Gameweek).filter(Gameweek.is_next == True).first()  # noqa: E712
+    gw = db.execute(_NEXT_GAMEWEEK).scalars().first()
     if not gw:
         return None
     return GameweekSchema.model_validate(gw)
@@ -38,7 +79,7 @@ def get_next_gameweek(db: Session = Depends(get_db)) -> GameweekSchema | None:
 @router.get("/{gw_id}", response_model=GameweekSchema)
 def get_gameweek(gw_id: int, db: Session = Depends(get_db)) -> GameweekSchema:
     """Get a specific gameweek by FPL ID."""
-    gw = db.query(Gameweek).filter(Gameweek.fpl_id == gw_id).first()
+    gw = db.execute(_GAMEWEEK_BY_FPL_ID, {"fpl_id": gw_id}).scalar_one_or_none()
     if not gw:
         raise HTTPException(status_code=404, detail="Gameweek not found")
     return GameweekSchema.model_validate(gw)
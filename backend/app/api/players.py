@@ -1,7 +1,8 @@
 """Player API routes."""
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import bindparam, lambda_stmt, select
+from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.models import Player, Team
@@ -10,6 +11,30 @@ from app.schemas import PlayerSchema
 router = APIRouter()
 
 
+def _player_select():
+    """Select players alongside their flat team fields via a single outer join."""
+    return select(
+        Player,
+        Team.name.label("team_name"),
+        Team.short_name.label("team_short_name"),
+    ).outerjoin(Team, Player.team_id == Team.id)
+
+
+# Cached lambda statement for the single-player lookup
+_PLAYER_BY_FPL_ID = lambda_stmt(
+    lambda: _player_select().where(Player.fpl_id == bindparam("fpl_id"))
+)
+
+
+def _to_schema(
+    player: Player, team_name: str | None, team_short_name: str | None
+) -> PlayerSchema:
+    """Validate a player row merged with its joined team columns."""
+    return PlayerSchema.model_validate(
+        {**player.__dict__, "team_name": team_name, "team_short_name": team_short_name}
+    )
+
+
 @router.get("", response_model=list[PlayerSchema])
 def list_players(
     position: str | None = Query(None, description="Filter by position (GKP, DEF, MID, FWD)"),
@@ -26,65 +51,32 @@ def list_players(
     - **limit**: Max players to return (default 100, max 1000)
     - **offset**: Pagination offset
     """
-    query = db.query(Player).options(joinedload(Player.team))
+    stmt = _player_select()
 
     if position:
-        query = query.filter(Player.position == position.upper())
+        stmt = stmt.where(Player.position == position.upper())
     if team_id:
-        team = db.query(Team).filter(Team.fpl_id == team_id).first()
-        if team:
-            query = query.filter(Player.team_id == team.id)
+        team_db_id = db.execute(
+            select(Team.id).where(Team.fpl_id == team_id)
+        ).scalar_one_or_none()
+        if team_db_id:
+            stmt = stmt.where(Player.team_id == team_db_id)
 
-    players = query.order_by(Player.web_name).offset(offset).limit(limit).all()
+    players = db.execute(
+        stmt.order_by(Player.web_name).offset(offset).limit(limit)
+    ).all()
 
     return [
-        PlayerSchema(
-            id=p.id,
-            fpl_id=p.fpl_id,
-            web_name=p.web_name,
-            first_name=p.first_name,
-            second_name=p.second_name,
-            position=p.position,
-            team_id=p.team_id,
-            team_name=p.team.name if p.team else None,
-            team_short_name=p.team.short_name if p.team else None,
-            now_cost=p.now_cost,
-            status=p.status,
-            chance_of_playing=p.chance_of_playing,
-            is_penalty_taker=p.is_penalty_taker,
-            is_corner_taker=p.is_corner_taker,
-            is_freekick_taker=p.is_freekick_taker,
-        )
-        for p in players
+        _to_schema(p, team_name, team_short_name)
+        for p, team_name, team_short_name in players
     ]
 
 
 @router.get("/{player_id}", response_model=PlayerSchema)
 def get_player(player_id: int, db: Session = Depends(get_db)) -> PlayerSchema:
     """Get a specific player by FPL ID."""
-    player = (
-        db.query(Player)
-        .options(joinedload(Player.team))
-        .filter(Player.fpl_id == player_id)
-        .first()
-    )
-    if not player:
+    row = db.execute(_PLAYER_BY_FPL_ID, {"fpl_id": player_id}).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Player not found")
 
-    return PlayerSchema(
-        id=player.id,
-        fpl_id=player.fpl_id,
-        web_name=player.web_name,
-        first_name=player.first_name,
-        second_name=player.second_name,
-        position=player.position,
-        team_id=player.team_id,
-        team_name=player.team.name if player.team else None,
-        team_short_name=player.team.short_name if player.team else None,
-        now_cost=player.now_cost,
-        status=player.status,
-        chance_of_playing=player.chance_of_playing,
-        is_penalty_taker=player.is_penalty_taker,
-        is_corner_taker=player.is_corner_taker,
-        is_freekick_taker=player.is_freekick_taker,
-    )
+    return _to_schema(*row)
@@ -2,10 +2,13 @@
 
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
 
-from app.database import get_db
+from app.api.etag import check_etag
+from app.database import get_async_db, get_db, loader_options
 from app.models import DreamTeam, Gameweek, Player, Prediction, PredictionPlayer
 from app.schemas import (
     DreamTeamPlayerSchema,
@@ -20,22 +23,53 @@ router = APIRouter()
 
 
 @router.get("/{gw_id}", response_model=PredictionSchema | None)
-def get_prediction(gw_id: int, db: Session = Depends(get_db)) -> PredictionSchema | None:
+async def get_prediction(
+    gw_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+) -> PredictionSchema | None:
     """
     Get the predicted Team of the Week for a gameweek.
 
     Args:
         gw_id: Gameweek FPL ID (1-38)
     """
-    gw = db.query(Gameweek).filter(Gameweek.fpl_id == gw_id).first()
-    if not gw:
+    # Predictions are immutable once written, so the newest id identifies the payload.
+    # Resolved together with the gameweek; no row means the gameweek is unknown.
+    version_row = (
+        await db.execute(
+            select(Gameweek.id, func.max(Prediction.id), func.count(Prediction.id))
+            .outerjoin(Prediction, Prediction.gameweek_id == Gameweek.id)
+            .filter(Gameweek.fpl_id == gw_id)
+            .group_by(Gameweek.id)
+        )
+    ).first()
+    if not version_row:
         raise HTTPException(status_code=404, detail="Gameweek not found")
 
+    gw_db_id, *version = version_row
+    not_modified = check_etag(request, response, "prediction", gw_db_id, *version)
+    if not_modified is not None:
+        return not_modified
+
     prediction = (
-        db.query(Prediction)
-        .options(joinedload(Prediction.players).joinedload(PredictionPlayer.player).joinedload(Player.team))
-        .filter(Prediction.gameweek_id == gw.id)
-        .order_by(Prediction.created_at.desc())
+        (
+            await db.execute(
+                select(Prediction)
+                .options(
+                    *loader_options(
+                        selectinload(Prediction.players)
+                        .joinedload(PredictionPlayer.player)
+                        .joinedload(Player.team)
+                    )
+                )
+                .filter(Prediction.gameweek_id == gw_db_id)
+                .order_by(Prediction.created_at.desc())
+                .limit(1)
+            )
+        )
+        .scalars()
         .first()
     )
 
@@ -43,7 +77,7 @@ def get_prediction(gw_id: int, db: Session = Depends(get_db)) -> PredictionSchem
         return None
 
     players = []
-    for pp in sorted(prediction.players, key=lambda x: x.position_slot):
+    for pp in prediction.players:
         player = pp.player
         if not player.team:
             logger.warning(f"Player {player.web_name} (id={player.id}) has no team association")
@@ -56,17 +90,17 @@ def get_prediction(gw_id: int, db: Session = Depends(get_db)) -> PredictionSchem
                 team_short_name=player.team.short_name if player.team else None,
                 team_fpl_id=player.team.fpl_id if player.team else None,
                 position_slot=pp.position_slot,
-                predicted_points=float(pp.predicted_points),
-                predicted_minutes=float(pp.predicted_minutes) if pp.predicted_minutes else None,
-                start_probability=float(pp.start_probability) if pp.start_probability else None,
-                confidence=float(pp.confidence) if pp.confidence else None,
+                predicted_points=pp.predicted_points,
+                predicted_minutes=pp.predicted_minutes,
+                start_probability=pp.start_probability,
+                confidence=pp.confidence,
             )
         )
 
     return PredictionSchema(
         id=prediction.id,
-        gameweek_id=gw.id,
-        gameweek_fpl_id=gw.fpl_id,
+        gameweek_id=gw_db_id,
+        gameweek_fpl_id=gw_id,
         model_version=prediction.model_version,
         created_at=prediction.created_at,
         total_predicted_points=prediction.total_predicted_points,
@@ -76,22 +110,41 @@ def get_prediction(gw_id: int, db: Session = Depends(get_db)) -> PredictionSchem
 
 
 @router.get("/dream-team/{gw_id}", response_model=DreamTeamSchema | None)
-def get_dream_team(gw_id: int, db: Session = Depends(get_db)) -> DreamTeamSchema | None:
+def get_dream_team(
+    gw_id: int, request: Request, response: Response, db: Session = Depends(get_db)
+) -> DreamTeamSchema | None:
     """
     Get the actual Dream Team (ground truth) for a gameweek.
 
     Args:
         gw_id: Gameweek FPL ID (1-38)
     """
-    gw = db.query(Gameweek).filter(Gameweek.fpl_id == gw_id).first()
+    gw = db.execute(
+        select(Gameweek).where(Gameweek.fpl_id == gw_id)
+    ).scalar_one_or_none()
     if not gw:
         raise HTTPException(status_code=404, detail="Gameweek not found")
 
+    # Syncs update points in place (e.g. bonus finalising), so include their sum
+    version = db.execute(
+        select(
+            func.max(DreamTeam.id), func.count(DreamTeam.id), func.sum(DreamTeam.points)
+        ).where(DreamTeam.gameweek_id == gw.id)
+    ).one()
+    not_modified = check_etag(request, response, "dream-team", gw.id, *version)
+    if not_modified is not None:
+        return not_modified
+
     dream_team_entries = (
-        db.query(DreamTeam)
-        .options(joinedload(DreamTeam.player).joinedload(Player.team))
-        .filter(DreamTeam.gameweek_id == gw.id)
-        .order_by(DreamTeam.position_slot)
+        db.execute(
+            select(DreamTeam)
+            .options(
+                *loader_options(joinedload(DreamTeam.player).joinedload(Player.team))
+            )
+            .where(DreamTeam.gameweek_id == gw.id)
+            .order_by(DreamTeam.position_slot)
+        )
+        .scalars()
         .all()
     )
 
@@ -137,27 +190,34 @@ def generate_prediction(gw_id: int, db: Session = Depends(get_db)) -> Prediction
     # Import here to avoid circular imports
     from app.services.predictor import generate_prediction as gen_pred
 
-    gw = db.query(Gameweek).filter(Gameweek.fpl_id == gw_id).first()
+    gw = db.execute(
+        select(Gameweek).where(Gameweek.fpl_id == gw_id)
+    ).scalar_one_or_none()
     if not gw:
         raise HTTPException(status_code=404, detail="Gameweek not found")
 
-    prediction = gen_pred(db, gw_id)
-    if not prediction:
+    generated = gen_pred(db, gw_id)
+    if not generated:
         raise HTTPException(
             status_code=400,
             detail="Could not generate prediction. Not enough historical data.",
         )
 
     # Reload with relationships
-    prediction = (
-        db.query(Prediction)
-        .options(joinedload(Prediction.players).joinedload(PredictionPlayer.player).joinedload(Player.team))
-        .filter(Prediction.id == prediction.id)
-        .first()
-    )
+    prediction = db.execute(
+        select(Prediction)
+        .options(
+            *loader_options(
+                selectinload(Prediction.players)
+                .joinedload(PredictionPlayer.player)
+                .joinedload(Player.team)
+            )
+        )
+        .where(Prediction.id == generated.prediction.id)
+    ).scalar_one()
 
     players = []
-    for pp in sorted(prediction.players, key=lambda x: x.position_slot):
+    for pp in prediction.players:
         player = pp.player
         players.append(
             PredictionPlayerSchema(
@@ -168,10 +228,10 @@ def generate_prediction(gw_id: int, db: Session = Depends(get_db)) -> Prediction
                 team_short_name=player.team.short_name if player.team else None,
                 team_fpl_id=player.team.fpl_id if player.team else None,
                 position_slot=pp.position_slot,
-                predicted_points=float(pp.predicted_points),
-                predicted_minutes=float(pp.predicted_minutes) if pp.predicted_minutes else None,
-                start_probability=float(pp.start_probability) if pp.start_probability else None,
-                confidence=float(pp.confidence) if pp.confidence else None,
+                predicted_points=pp.predicted_points,
+                predicted_minutes=pp.predicted_minutes,
+                start_probability=pp.start_probability,
+                confidence=pp.confidence,
             )
         )
 
@@ -1,20 +1,85 @@
 """Data sync API routes."""
 
-from fastapi import APIRouter, Depends
+import logging
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
 
-from app.database import get_db
-from app.schemas import SyncResultSchema
+from app.api.gameweeks import clear_gameweek_cache
+from app.database import SessionLocal, get_db
+from app.models import SyncRun
+from app.schemas import SyncRunSchema
 from app.services.data_ingestion import sync_fpl_data
 from app.services.understat_sync import sync_understat_data
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 
-@router.post("/fpl", response_model=SyncResultSchema)
-def sync_fpl_endpoint(db: Session = Depends(get_db)) -> SyncResultSchema:
+def _execute_sync_run(run_id: int, season: str | None = None) -> None:
+    """
+    Run a queued sync and record its outcome on the SyncRun row.
+
+    Runs after the response is sent, so it opens its own session rather
+    than reusing the request-scoped one.
+    """
+    db = SessionLocal()
+    try:
+        run = db.get(SyncRun, run_id)
+        run.status = "running"
+        db.commit()
+
+        try:
+            if run.source == "fpl":
+                result = sync_fpl_data(db)
+            elif run.source == "understat":
+                result = sync_understat_data(db, season)
+            else:
+                result = {
+                    "fpl": sync_fpl_data(db),
+                    "understat": sync_understat_data(db, season),
+                }
+        except Exception as e:
+            logger.exception(f"Sync run {run_id} ({run.source}) failed")
+            db.rollback()
+            run.status = "failed"
+            run.error = str(e)
+        else:
+            run.status = "completed"
+            run.result = result
+        run.finished_at = func.now()
+        db.commit()
+
+        if run.source in ("fpl", "all"):
+            clear_gameweek_cache()
+    finally:
+        db.close()
+
+
+def _start_sync_run(
+    db: Session,
+    background_tasks: BackgroundTasks,
+    source: str,
+    season: str | None = None,
+) -> SyncRunSchema:
+    """Record a pending sync run and schedule it in the background."""
+    run = SyncRun(source=source, status="pending")
+    db.add(run)
+    db.commit()
+    db.refresh(run)
+
+    background_tasks.add_task(_execute_sync_run, run.id, season)
+    return SyncRunSchema.model_validate(run)
+
+
+@router.post("/fpl", response_model=SyncRunSchema, status_code=202)
+def sync_fpl_endpoint(
+    background_tasks: BackgroundTasks, db: Session = Depends(get_db)
+) -> SyncRunSchema:
     """
-    Sync all FPL data from the official API.
+    Sync all FPL data from the official API in the background.
 
     This fetches:
     - Teams
@@ -23,18 +88,20 @@ def sync_fpl_endpoint(db: Session = Depends(get_db)) -> SyncResultSchema:
     - Fixtures
     - Player stats for finished gameweeks
     - Dream teams for finished gameweeks
+
+    Returns the queued run; poll GET /runs/{run_id} for its result.
     """
-    result = sync_fpl_data(db)
-    return SyncResultSchema(**result)
+    return _start_sync_run(db, background_tasks, "fpl")
 
 
-@router.post("/understat")
+@router.post("/understat", response_model=SyncRunSchema, status_code=202)
 def sync_understat_endpoint(
+    background_tasks: BackgroundTasks,
     season: str = "2024",
     db: Session = Depends(get_db),
-) -> dict:
+) -> SyncRunSchema:
     """
-    Sync xG/xA data from Understat.
+    Sync xG/xA data from Understat in the background.
 
     This fetches expected goals data for all EPL players and
     matches them to FPL players for enhanced predictions.
@@ -42,22 +109,25 @@ def sync_understat_endpoint(
     Args:
         season: Season year (e.g., "2024" for 2024/25 season)
     """
-    result = sync_understat_data(db, season)
-    return result
+    return _start_sync_run(db, background_tasks, "understat", season)
 
 
-@router.post("/all")
+@router.post("/all", response_model=SyncRunSchema, status_code=202)
 def sync_all_endpoint(
+    background_tasks: BackgroundTasks,
     season: str = "2024",
     db: Session = Depends(get_db),
-) -> dict:
+) -> SyncRunSchema:
     """
-    Sync all data sources (FPL + Understat).
+    Sync all data sources (FPL + Understat) in the background.
     """
-    fpl_result = sync_fpl_data(db)
-    understat_result = sync_understat_data(db, season)
+    return _start_sync_run(db, background_tasks, "all", season)
+
 
-    return {
-        "fpl": fpl_result,
-        "understat": understat_result,
-    }
+@router.get("/runs/{run_id}", response_model=SyncRunSchema)
+def get_sync_run(run_id: int, db: Session = Depends(get_db)) -> SyncRunSchema:
+    """Get the status (and result, once finished) of a sync run."""
+    run = db.get(SyncRun, run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Sync run not found")
+    return SyncRunSchema.model_validate(run)
@@ -119,24 +119,28 @@ class PointsSystem:
     @classmethod
     def goal_points(cls, position: Position) -> int:
         """Get goal points for a position."""
-        mapping = {
-            Position.GKP: cls.GOAL_GKP,
-            Position.DEF: cls.GOAL_DEF,
-            Position.MID: cls.GOAL_MID,
-            Position.FWD: cls.GOAL_FWD,
-        }
-        return mapping.get(position, cls.GOAL_FWD)
+        return _GOAL_POINTS.get(position, cls.GOAL_FWD)
 
     @classmethod
     def clean_sheet_points(cls, position: Position) -> int:
         """Get clean sheet points for a position."""
-        mapping = {
-            Position.GKP: cls.CLEAN_SHEET_GKP,
-            Position.DEF: cls.CLEAN_SHEET_DEF,
-            Position.MID: cls.CLEAN_SHEET_MID,
-            Position.FWD: cls.CLEAN_SHEET_FWD,
-        }
-        return mapping.get(position, 0)
+        return _CLEAN_SHEET_POINTS.get(position, 0)
+
+
+# Per-position lookups built once at import (used in feature engineering loops)
+_GOAL_POINTS: dict[Position, int] = {
+    Position.GKP: PointsSystem.GOAL_GKP,
+    Position.DEF: PointsSystem.GOAL_DEF,
+    Position.MID: PointsSystem.GOAL_MID,
+    Position.FWD: PointsSystem.GOAL_FWD,
+}
+
+_CLEAN_SHEET_POINTS: dict[Position, int] = {
+    Position.GKP: PointsSystem.CLEAN_SHEET_GKP,
+    Position.DEF: PointsSystem.CLEAN_SHEET_DEF,
+    Position.MID: PointsSystem.CLEAN_SHEET_MID,
+    Position.FWD: PointsSystem.CLEAN_SHEET_FWD,
+}
 
 
 # Rolling window sizes for feature engineering - from shared constants
@@ -148,6 +152,9 @@ MIN_GAMEWEEKS_FOR_PREDICTION: int = _SHARED["minGameweeksForPrediction"]
 # API rate limiting - from shared constants
 FPL_API_RATE_LIMIT_SECONDS: float = _SHARED["apiRateLimitSeconds"]
 
+# Concurrent FPL API requests when fetching many gameweeks (backend-only)
+FPL_API_MAX_CONCURRENCY = 5
+
 # FPL API base URL - from shared constants
 FPL_API_BASE_URL: str = _SHARED["fplApiBaseUrl"]
 
@@ -168,5 +175,9 @@ DEFAULT_MODEL_PARAMS = {
 }
 
 # Cache TTLs (backend-only, not shared)
-CACHE_TTL_BOOTSTRAP = 3600  # 1 hour
+CACHE_TTL_BOOTSTRAP = 600  # 10 minutes
 CACHE_TTL_LIVE = 60  # 1 minute
+CACHE_TTL_FOREVER = None  # Finished gameweeks never change
+
+# Trained LightGBM models kept in the on-disk model cache (backend-only)
+MODEL_CACHE_MAX_ENTRIES = 32
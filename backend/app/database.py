@@ -1,22 +1,48 @@
 """Database connection and session management."""
 
 from sqlalchemy import create_engine
-from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, raiseload, sessionmaker
 
 from app.config import get_settings
 
 settings = get_settings()
 
+# Shared by the sync and async engines; pre-ping and recycle drop connections
+# that PgBouncer/RDS closed while idle
+_POOL_OPTIONS = dict(
+    pool_pre_ping=True,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle,
+)
+
 engine = create_engine(
     settings.database_url,
-    pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10,
+    **_POOL_OPTIONS,
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+def _async_database_url(url: str) -> str:
+    """Point a sync database URL at its async driver."""
+    return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+
+# Async engine for read endpoints, so DB waits yield to the event loop
+# instead of holding a threadpool worker
+async_engine = create_async_engine(
+    _async_database_url(settings.database_url),
+    **_POOL_OPTIONS,
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+
 class Base(DeclarativeBase):
     """Base class for all SQLAlchemy models."""
 
@@ -30,3 +56,22 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Dependency to get an async database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def loader_options(*options):
+    """
+    Build query loader options, adding raiseload("*") in debug mode.
+
+    In debug mode any relationship that is not explicitly eager-loaded raises
+    on access, so accidental N+1 lazy loads surface during development instead
+    of as silent slowness in production.
+    """
+    if settings.debug:
+        return (*options, raiseload("*"))
+    return options
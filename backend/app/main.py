@@ -1,9 +1,13 @@
 """FastAPI application entry point."""
 
 import logging
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
 
 from app.api import gameweeks, players, predictions, sync, backtest
 from app.config import get_settings
@@ -16,10 +20,21 @@ logging.basicConfig(
 
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize the in-process response cache on startup."""
+    FastAPICache.init(InMemoryBackend())
+    yield
+
+
 app = FastAPI(
     title="FPL Team of the Week Predictor",
     description="Predict the FPL Dream Team (Team of the Week) using ML",
     version="1.0.0",
+    lifespan=lifespan,
+    # Response models are serialized by pydantic-core; orjson encodes the result
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware
@@ -2,14 +2,39 @@
 
 import logging
 from dataclasses import dataclass
+from functools import lru_cache
 
 import numpy as np
+import scipy.sparse as sp
 from scipy.optimize import milp, Bounds, LinearConstraint
 
 from app.constants import FORMATION_CONSTRAINTS, Position
 
 logger = logging.getLogger(__name__)
 
+# Display order of positions in the selected XI
+_POSITION_ORDER = {
+    Position.GKP.value: 0,
+    Position.DEF.value: 1,
+    Position.MID.value: 2,
+    Position.FWD.value: 3,
+}
+
+# Up to this many candidates, enumerating formations beats MILP solver startup
+_ENUMERATION_MAX_CANDIDATES = 20
+
+# Spare candidates kept per position beyond its maximum count in the XI
+_PRUNE_SAFETY = 3
+
+# Every (DEF, MID, FWD) split allowed by the constraints, same space as the MILP
+_OUTFIELD_SPLITS = [
+    (n_def, n_mid, n_fwd)
+    for n_def in range(FORMATION_CONSTRAINTS["min_def"], FORMATION_CONSTRAINTS["max_def"] + 1)
+    for n_mid in range(FORMATION_CONSTRAINTS["min_mid"], FORMATION_CONSTRAINTS["max_mid"] + 1)
+    for n_fwd in range(FORMATION_CONSTRAINTS["min_fwd"], FORMATION_CONSTRAINTS["max_fwd"] + 1)
+    if 1 + n_def + n_mid + n_fwd == FORMATION_CONSTRAINTS["total_players"]
+]
+
 
 @dataclass
 class PlayerPrediction:
@@ -28,6 +53,31 @@ def solve_formation(
     """
     Select optimal XI from player predictions using integer linear programming.
 
+    Thin wrapper over solve_formation_vec for callers holding prediction
+    objects.
+
+    Args:
+        predictions: List of player predictions
+
+    Returns:
+        Tuple of (selected XI, formation string like "4-5-1")
+    """
+    n = len(predictions)
+    positions = np.fromiter((p.position for p in predictions), dtype="U3", count=n)
+    points = np.fromiter(
+        (p.predicted_points for p in predictions), dtype=np.float64, count=n
+    )
+    selected_idx, formation = solve_formation_vec(positions, points)
+    return [predictions[i] for i in selected_idx], formation
+
+
+def solve_formation_vec(
+    positions: np.ndarray,
+    points: np.ndarray,
+) -> tuple[np.ndarray, str]:
+    """
+    Select optimal XI from parallel position/points arrays.
+
     Constraints:
     - Exactly 1 GKP
     - 3-5 DEF
@@ -36,91 +86,91 @@ def solve_formation(
     - Exactly 11 players total
 
     Args:
-        predictions: List of player predictions
+        positions: Position code per candidate ("GKP", "DEF", "MID", "FWD")
+        points: Predicted points per candidate
 
     Returns:
-        Tuple of (selected XI, formation string like "4-5-1")
+        Tuple of (indices of the selected XI in display order, formation
+        string like "4-5-1")
     """
-    if len(predictions) < 11:
-        logger.warning(f"Only {len(predictions)} players available, need at least 11")
-        return predictions[:11] if predictions else [], "N/A"
+    n = len(points)
+    if n < 11:
+        logger.warning(f"Only {n} players available, need at least 11")
+        return np.arange(n), "N/A"
 
-    n = len(predictions)
-
-    # Group by position
-    gkp_idx = [i for i, p in enumerate(predictions) if p.position == Position.GKP.value]
-    def_idx = [i for i, p in enumerate(predictions) if p.position == Position.DEF.value]
-    mid_idx = [i for i, p in enumerate(predictions) if p.position == Position.MID.value]
-    fwd_idx = [i for i, p in enumerate(predictions) if p.position == Position.FWD.value]
+    points_arr = np.asarray(points, dtype=np.float64)
+    gkp_idx = np.flatnonzero(positions == Position.GKP.value)
+    def_idx = np.flatnonzero(positions == Position.DEF.value)
+    mid_idx = np.flatnonzero(positions == Position.MID.value)
+    fwd_idx = np.flatnonzero(positions == Position.FWD.value)
 
     # Check if we have enough players
     if len(gkp_idx) < 1:
         logger.error("No goalkeepers available")
-        return [], "N/A"
+        return np.empty(0, dtype=np.intp), "N/A"
     if len(def_idx) < FORMATION_CONSTRAINTS["min_def"]:
         logger.error(f"Only {len(def_idx)} defenders available, need at least {FORMATION_CONSTRAINTS['min_def']}")
-        return [], "N/A"
+        return np.empty(0, dtype=np.intp), "N/A"
     if len(mid_idx) < FORMATION_CONSTRAINTS["min_mid"]:
         logger.error(f"Only {len(mid_idx)} midfielders available, need at least {FORMATION_CONSTRAINTS['min_mid']}")
-        return [], "N/A"
+        return np.empty(0, dtype=np.intp), "N/A"
     if len(fwd_idx) < FORMATION_CONSTRAINTS["min_fwd"]:
         logger.error(f"Only {len(fwd_idx)} forwards available, need at least {FORMATION_CONSTRAINTS['min_fwd']}")
-        return [], "N/A"
+        return np.empty(0, dtype=np.intp), "N/A"
+
+    # Shortlisted squads: skip the solver entirely
+    if n == 11 and (len(def_idx), len(mid_idx), len(fwd_idx)) in _OUTFIELD_SPLITS:
+        return _finalize_selection(np.arange(n), positions, points_arr)
+    if n <= _ENUMERATION_MAX_CANDIDATES:
+        chosen = _enumerate_formations(points_arr, gkp_idx, def_idx, mid_idx, fwd_idx)
+        if chosen is None:
+            return _fallback_selection(positions, points_arr), "N/A"
+        return _finalize_selection(chosen, positions, points_arr)
+
+    # Only a position's top max-count players can make the XI, so the tail
+    # is dropped before building the program
+    groups = [
+        _top_candidates(points_arr, gkp_idx, FORMATION_CONSTRAINTS["max_gkp"]),
+        _top_candidates(points_arr, def_idx, FORMATION_CONSTRAINTS["max_def"]),
+        _top_candidates(points_arr, mid_idx, FORMATION_CONSTRAINTS["max_mid"]),
+        _top_candidates(points_arr, fwd_idx, FORMATION_CONSTRAINTS["max_fwd"]),
+    ]
+    sizes = [len(g) for g in groups]
+    candidates = np.concatenate(groups)
+    n_candidates = len(candidates)
 
     # Objective: maximize predicted points (negative for minimization)
-    c = np.array([-p.predicted_points for p in predictions])
-
-    # Constraints matrix
-    constraints = []
-
-    # Total players = 11
-    A_total = np.ones(n)
-    constraints.append(LinearConstraint(A_total, 11, 11))
-
-    # GKP = 1
-    A_gkp = np.zeros(n)
-    for i in gkp_idx:
-        A_gkp[i] = 1
-    constraints.append(LinearConstraint(A_gkp, 1, 1))
-
-    # DEF: 3-5
-    A_def = np.zeros(n)
-    for i in def_idx:
-        A_def[i] = 1
-    constraints.append(
-        LinearConstraint(
-            A_def,
-            FORMATION_CONSTRAINTS["min_def"],
-            FORMATION_CONSTRAINTS["max_def"],
-        )
+    c = np.negative(points_arr[candidates])
+
+    # Constraints: one sparse row per group (all candidates, GKP, DEF, MID,
+    # FWD) with a single nonzero per member. Candidates are laid out group by
+    # group, so each position row is a contiguous column range.
+    indptr = np.cumsum([0, n_candidates, *sizes])
+    indices = np.concatenate((np.arange(n_candidates), np.arange(n_candidates)))
+    A = sp.csr_matrix(
+        (np.ones(len(indices)), indices, indptr), shape=(5, n_candidates)
     )
-
-    # MID: 2-5
-    A_mid = np.zeros(n)
-    for i in mid_idx:
-        A_mid[i] = 1
-    constraints.append(
-        LinearConstraint(
-            A_mid,
+    lb = np.array(
+        [
+            11,
+            1,
+            FORMATION_CONSTRAINTS["min_def"],
             FORMATION_CONSTRAINTS["min_mid"],
-            FORMATION_CONSTRAINTS["max_mid"],
-        )
-    )
-
-    # FWD: 1-3
-    A_fwd = np.zeros(n)
-    for i in fwd_idx:
-        A_fwd[i] = 1
-    constraints.append(
-        LinearConstraint(
-            A_fwd,
             FORMATION_CONSTRAINTS["min_fwd"],
+        ]
+    )
+    ub = np.array(
+        [
+            11,
+            1,
+            FORMATION_CONSTRAINTS["max_def"],
+            FORMATION_CONSTRAINTS["max_mid"],
             FORMATION_CONSTRAINTS["max_fwd"],
-        )
+        ]
     )
+    constraints = LinearConstraint(A, lb, ub)
 
-    # Bounds: binary variables (0 or 1)
-    bounds = Bounds(lb=np.zeros(n), ub=np.ones(n))
+    bounds, integrality = _binary_milp_setup(n_candidates)
 
     # Solve as integer program
     try:
@@ -128,61 +178,121 @@ def solve_formation(
             c=c,
             constraints=constraints,
             bounds=bounds,
-            integrality=np.ones(n),  # All variables are integers
+            integrality=integrality,
         )
 
         if not result.success:
             logger.warning(f"Optimization failed: {result.message}")
-            return _fallback_selection(predictions), "N/A"
+            return _fallback_selection(positions, points_arr), "N/A"
 
         # Extract selected players
-        selected_idx = np.where(result.x > 0.5)[0]
-        selected = [predictions[i] for i in selected_idx]
-
-        # Determine formation
-        n_def = sum(1 for p in selected if p.position == Position.DEF.value)
-        n_mid = sum(1 for p in selected if p.position == Position.MID.value)
-        n_fwd = sum(1 for p in selected if p.position == Position.FWD.value)
-        formation = f"{n_def}-{n_mid}-{n_fwd}"
-
-        # Sort by position for display
-        position_order = {
-            Position.GKP.value: 0,
-            Position.DEF.value: 1,
-            Position.MID.value: 2,
-            Position.FWD.value: 3,
-        }
-        selected.sort(key=lambda p: (position_order.get(p.position, 4), -p.predicted_points))
-
-        return selected, formation
+        selected_idx = np.sort(candidates[result.x > 0.5])
+        return _finalize_selection(selected_idx, positions, points_arr)
 
     except Exception as e:
         logger.error(f"Formation solver error: {e}")
-        return _fallback_selection(predictions), "N/A"
-
-
-def _fallback_selection(predictions: list[PlayerPrediction]) -> list[PlayerPrediction]:
-    """Fallback greedy selection if optimization fails."""
-    by_position = {
-        Position.GKP.value: [],
-        Position.DEF.value: [],
-        Position.MID.value: [],
-        Position.FWD.value: [],
-    }
-
-    for p in predictions:
-        if p.position in by_position:
-            by_position[p.position].append(p)
-
-    # Sort each by predicted points
-    for pos in by_position:
-        by_position[pos].sort(key=lambda x: -x.predicted_points)
-
-    # Select greedily: 1 GK, 4 DEF, 4 MID, 2 FWD (4-4-2)
-    selected = []
-    selected.extend(by_position[Position.GKP.value][:1])
-    selected.extend(by_position[Position.DEF.value][:4])
-    selected.extend(by_position[Position.MID.value][:4])
-    selected.extend(by_position[Position.FWD.value][:2])
-
-    return selected
+        return _fallback_selection(positions, points_arr), "N/A"
+
+
+def _top_candidates(points: np.ndarray, idx: np.ndarray, max_count: int) -> np.ndarray:
+    """Indices in idx of the max_count + _PRUNE_SAFETY highest predicted points."""
+    keep = max_count + _PRUNE_SAFETY
+    if len(idx) <= keep:
+        return idx
+    return idx[np.argpartition(-points[idx], keep - 1)[:keep]]
+
+
+@lru_cache(maxsize=8)
+def _binary_milp_setup(n: int) -> tuple[Bounds, np.ndarray]:
+    """
+    Binary (0 or 1) bounds and all-integer integrality for n variables.
+
+    Cached by n since the candidate count is stable across backtest solves;
+    the arrays are marked read-only as they are shared between calls.
+    """
+    lb, ub = np.zeros(n), np.ones(n)
+    integrality = np.ones(n, dtype=np.uint8)
+    for arr in (lb, ub, integrality):
+        arr.flags.writeable = False
+    return Bounds(lb=lb, ub=ub), integrality
+
+
+def _enumerate_formations(
+    points: np.ndarray,
+    gkp_idx: np.ndarray,
+    def_idx: np.ndarray,
+    mid_idx: np.ndarray,
+    fwd_idx: np.ndarray,
+) -> np.ndarray | None:
+    """
+    Exact optimum for small squads by scoring every allowed formation.
+
+    With only per-position count constraints, the best XI for a formation is
+    the top-k players of each position, so prefix sums of each position's
+    sorted points give every formation's total directly.
+
+    Returns:
+        Indices of the selected XI, or None if no allowed formation fits
+    """
+    def ranked(idx: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        order = idx[np.argsort(-points[idx], kind="stable")]
+        return order, np.concatenate(([0.0], np.cumsum(points[order])))
+
+    gkp_order, gkp_cum = ranked(gkp_idx)
+    def_order, def_cum = ranked(def_idx)
+    mid_order, mid_cum = ranked(mid_idx)
+    fwd_order, fwd_cum = ranked(fwd_idx)
+
+    best_total, best_split = None, None
+    for n_def, n_mid, n_fwd in _OUTFIELD_SPLITS:
+        if n_def > len(def_order) or n_mid > len(mid_order) or n_fwd > len(fwd_order):
+            continue
+        total = gkp_cum[1] + def_cum[n_def] + mid_cum[n_mid] + fwd_cum[n_fwd]
+        if best_total is None or total > best_total:
+            best_total, best_split = total, (n_def, n_mid, n_fwd)
+
+    if best_split is None:
+        return None
+
+    n_def, n_mid, n_fwd = best_split
+    return np.concatenate(
+        (gkp_order[:1], def_order[:n_def], mid_order[:n_mid], fwd_order[:n_fwd])
+    )
+
+
+def _finalize_selection(
+    selected_idx: np.ndarray,
+    positions: np.ndarray,
+    points: np.ndarray,
+) -> tuple[np.ndarray, str]:
+    """Derive the formation string and sort the XI by position for display."""
+    order = np.fromiter(
+        (_POSITION_ORDER.get(pos, 4) for pos in positions[selected_idx]),
+        dtype=np.int64,
+        count=len(selected_idx),
+    )
+
+    # One counting pass over the display codes gives the whole formation
+    counts = np.bincount(order, minlength=len(_POSITION_ORDER) + 1)
+    n_def = counts[_POSITION_ORDER[Position.DEF.value]]
+    n_mid = counts[_POSITION_ORDER[Position.MID.value]]
+    n_fwd = counts[_POSITION_ORDER[Position.FWD.value]]
+    formation = f"{n_def}-{n_mid}-{n_fwd}"
+
+    # Position order, then points descending, then original index for ties
+    ranked = selected_idx[np.lexsort((selected_idx, -points[selected_idx], order))]
+    return ranked, formation
+
+
+def _fallback_selection(positions: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """Fallback greedy 4-4-2 selection if optimization fails."""
+    picks = []
+    for position, count in (
+        (Position.GKP.value, 1),
+        (Position.DEF.value, 4),
+        (Position.MID.value, 4),
+        (Position.FWD.value, 2),
+    ):
+        idx = np.flatnonzero(positions == position)
+        picks.append(idx[np.argsort(-points[idx], kind="stable")[:count]])
+    return np.concatenate(picks)
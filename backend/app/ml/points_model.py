@@ -1,14 +1,15 @@
 """Points prediction model using LightGBM."""
 
+import json
 import logging
-import pickle
 from pathlib import Path
 from typing import Any
 
+import lightgbm as lgb
 import numpy as np
 import pandas as pd
 from lightgbm import LGBMRegressor
-from sklearn.model_selection import TimeSeriesSplit, cross_val_score
+from sklearn.model_selection import TimeSeriesSplit
 
 from app.constants import DEFAULT_MODEL_PARAMS, Position
 
@@ -88,6 +89,13 @@ FEATURE_COLUMNS = [
     "games_played",
 ]
 
+FEATURE_COLUMNS_SET = frozenset(FEATURE_COLUMNS)
+
+
+def _to_float32(X: pd.DataFrame) -> np.ndarray:
+    """Convert a feature frame to a C-contiguous float32 array, keeping NaN."""
+    return np.ascontiguousarray(X.to_numpy(dtype=np.float32, na_value=np.nan))
+
 
 class PointsPredictor:
     """LightGBM model to predict FPL points."""
@@ -95,8 +103,14 @@ class PointsPredictor:
     def __init__(self):
         params = DEFAULT_MODEL_PARAMS["lightgbm"].copy()
         self.model = LGBMRegressor(**params)
+        # Booster loaded from disk by load(); predict() uses it instead of model
+        self._booster: lgb.Booster | None = None
         self.is_fitted = False
         self.feature_importance: dict[str, float] = {}
+        self.feature_names: list[str] = []  # Training column order, reused by predict
+        # Positions of feature_names in the last column layout seen
+        self._feature_columns: pd.Index | None = None
+        self._feature_idx: np.ndarray | None = None
 
     def train(self, X: pd.DataFrame, y: pd.Series) -> dict[str, Any]:
         """
@@ -110,20 +124,26 @@ class PointsPredictor:
             Training metrics
         """
         # Select and validate features
-        available_features = [f for f in FEATURE_COLUMNS if f in X.columns]
+        feature_idx = [i for i, c in enumerate(X.columns) if c in FEATURE_COLUMNS_SET]
+        available_features = [X.columns[i] for i in feature_idx]
         if len(available_features) < len(FEATURE_COLUMNS) / 2:
             logger.warning(
                 f"Only {len(available_features)}/{len(FEATURE_COLUMNS)} features available"
             )
 
-        X_train = X[available_features].copy()
-
-        # Fill NaN with 0
-        X_train = X_train.fillna(0)
+        # Missing stats stay NaN so LightGBM routes them down its missing-value
+        # branch rather than treating them as a real zero. Contiguous float32
+        # halves the memory LightGBM reads while binning.
+        X_train = _to_float32(X.iloc[:, feature_idx])
+        y_train = y.to_numpy(dtype=np.float32)
+        self.feature_names = available_features
+        self._feature_columns = X.columns
+        self._feature_idx = np.array(feature_idx, dtype=np.intp)
 
         # Train
         logger.info(f"Training on {len(X_train)} samples with {len(available_features)} features")
-        self.model.fit(X_train, y)
+        self.model.fit(X_train, y_train, feature_name=available_features)
+        self._booster = None
         self.is_fitted = True
 
         # Store feature importance
@@ -137,20 +157,10 @@ class PointsPredictor:
         if n_samples >= 10:
             # Use TimeSeriesSplit: train on past, validate on future
             n_splits = min(5, n_samples // 2)
-            tscv = TimeSeriesSplit(n_splits=n_splits)
-            cv_scores = cross_val_score(
-                self.model, X_train, y, cv=tscv, scoring="neg_mean_absolute_error"
-            )
-            cv_mae = -cv_scores.mean()
-            cv_mae_std = cv_scores.std()
+            cv_mae, cv_mae_std = self._time_series_cv(X_train, y_train, n_splits)
         elif n_samples >= 4:
             # Smaller dataset: use 2-fold time split
-            tscv = TimeSeriesSplit(n_splits=2)
-            cv_scores = cross_val_score(
-                self.model, X_train, y, cv=tscv, scoring="neg_mean_absolute_error"
-            )
-            cv_mae = -cv_scores.mean()
-            cv_mae_std = cv_scores.std()
+            cv_mae, cv_mae_std = self._time_series_cv(X_train, y_train, 2)
         else:
             # Cannot do CV with < 4 samples
             logger.warning("Too few samples for cross-validation, skipping CV")
@@ -167,6 +177,33 @@ class PointsPredictor:
             )[:10],
         }
 
+    def _time_series_cv(
+        self, X: np.ndarray, y: np.ndarray, n_splits: int
+    ) -> tuple[float, float]:
+        """
+        Mean and std of out-of-fold MAE over a TimeSeriesSplit.
+
+        Trains boosters directly with lgb.train on array slices, skipping
+        cross_val_score's estimator cloning and scorer dispatch. Each fold
+        bins and trains on its own past only (no shared Dataset or warm
+        start), so scores match cross_val_score exactly.
+        """
+        params = {"objective": "regression", **self.model.get_params()}
+        num_boost_round = params.pop("n_estimators")
+        for key in ("boosting_type", "class_weight", "importance_type", "n_jobs"):
+            params.pop(key, None)
+
+        maes = []
+        for train_idx, val_idx in TimeSeriesSplit(n_splits=n_splits).split(X):
+            booster = lgb.train(
+                params,
+                lgb.Dataset(X[train_idx], y[train_idx], feature_name=self.feature_names),
+                num_boost_round=num_boost_round,
+            )
+            maes.append(np.mean(np.abs(booster.predict(X[val_idx]) - y[val_idx])))
+
+        return float(np.mean(maes)), float(np.std(maes))
+
     def predict(self, X: pd.DataFrame) -> np.ndarray:
         """
         Predict points for players.
@@ -180,34 +217,65 @@ class PointsPredictor:
         if not self.is_fitted:
             raise ValueError("Model not fitted. Call train() first.")
 
-        available_features = [f for f in FEATURE_COLUMNS if f in X.columns]
-        X_pred = X[available_features].fillna(0)
+        # Same columns in the same order as training; absent ones become NaN
+        feature_idx = self._feature_positions(X.columns)
+        if feature_idx is not None:
+            X_pred = _to_float32(X.iloc[:, feature_idx])
+        else:
+            X_pred = _to_float32(X.reindex(columns=self.feature_names))
 
-        predictions = self.model.predict(X_pred)
+        model = self.model if self._booster is None else self._booster
+        predictions = model.predict(X_pred)
 
-        # Ensure non-negative predictions
-        predictions = np.maximum(predictions, 0)
+        # Ensure non-negative predictions, clamping in place
+        np.clip(predictions, 0, None, out=predictions)
 
         return predictions
 
+    def _feature_positions(self, columns: pd.Index) -> np.ndarray | None:
+        """
+        Positions of the training features in columns, or None if any is absent.
+
+        Cached for the last column layout, since feature frames are rebuilt
+        with the same columns on every call.
+        """
+        if self._feature_columns is None or not columns.equals(self._feature_columns):
+            idx = columns.get_indexer(self.feature_names)
+            self._feature_columns = columns
+            self._feature_idx = idx if (idx >= 0).all() else None
+        return self._feature_idx
+
     def save(self, path: str | Path) -> None:
-        """Save model to file."""
+        """
+        Save model to file.
+
+        The booster is written in LightGBM's native text format at `path`,
+        with fitted state and feature importance in a JSON sidecar next to it.
+        """
         path = Path(path)
         path.parent.mkdir(parents=True, exist_ok=True)
-        with open(path, "wb") as f:
-            pickle.dump(
+        booster = self.model.booster_ if self._booster is None else self._booster
+        booster.save_model(str(path))
+        with open(path.with_suffix(".json"), "w") as f:
+            json.dump(
                 {
-                    "model": self.model,
                     "is_fitted": self.is_fitted,
-                    "feature_importance": self.feature_importance,
+                    "feature_importance": {
+                        k: float(v) for k, v in self.feature_importance.items()
+                    },
                 },
                 f,
             )
 
     def load(self, path: str | Path) -> None:
         """Load model from file."""
-        with open(path, "rb") as f:
-            data = pickle.load(f)
-            self.model = data["model"]
-            self.is_fitted = data["is_fitted"]
-            self.feature_importance = data["feature_importance"]
+        path = Path(path)
+        booster = lgb.Booster(model_file=str(path))
+        with open(path.with_suffix(".json")) as f:
+            data = json.load(f)
+
+        self._booster = booster
+        self.feature_names = booster.feature_name()
+        self._feature_columns = self._feature_idx = None
+        self.is_fitted = data["is_fitted"]
+        self.feature_importance = data["feature_importance"]
@@ -60,37 +60,19 @@ class SimpleFormPredictor:
         Returns:
             Array of predicted points
         """
-        predictions = []
-
-        for _, row in X.iterrows():
-            # Base prediction from weighted form
-            base_pred = (
-                self.weight_3 * row.get("points_mean_3", 0)
-                + self.weight_5 * row.get("points_mean_5", 0)
-                + self.weight_8 * row.get("points_mean_8", 0)
-            )
-
-            # Calculate fixture modifier
-            modifier = 1.0
-
-            # Home advantage
-            if row.get("is_home", 0) == 1:
-                modifier += self.home_bonus
-
-            # Fixture difficulty adjustment
-            difficulty = row.get("fixture_difficulty", 3)
-            if difficulty <= 2:
-                modifier += self.easy_fixture_bonus
-            elif difficulty >= 4:
-                modifier -= self.hard_fixture_penalty
-
-            # Apply modifier
-            pred = base_pred * modifier
-
-            # Minimum 0 points
-            predictions.append(max(0, pred))
-
-        return np.array(predictions)
+        def column(name: str, default: float) -> np.ndarray:
+            if name not in X:
+                return np.full(len(X), default, dtype=np.float64)
+            return X[name].to_numpy(dtype=np.float64, na_value=np.nan)
+
+        return _simple_predict_kernel(
+            column("points_mean_3", 0),
+            column("points_mean_5", 0),
+            column("points_mean_8", 0),
+            column("is_home", 0),
+            column("fixture_difficulty", 3),
+            self,
+        )
 
     def get_params(self) -> dict[str, Any]:
         """Get model parameters."""
@@ -104,6 +86,49 @@ class SimpleFormPredictor:
         }
 
 
+def _simple_predict_kernel(
+    p3: np.ndarray,
+    p5: np.ndarray,
+    p8: np.ndarray,
+    is_home: np.ndarray,
+    difficulty: np.ndarray,
+    model: SimpleFormPredictor,
+) -> np.ndarray:
+    """
+    Weighted form times fixture modifier, floored at 0.
+
+    Works in two scratch buffers with in-place ufuncs rather than allocating
+    a temporary per term. Inputs may be views of the caller's frame, so they
+    are never written to.
+    """
+    # Base prediction from weighted form
+    pred = np.multiply(p3, model.weight_3)
+    tmp = np.multiply(p5, model.weight_5)
+    pred += tmp
+    np.multiply(p8, model.weight_8, out=tmp)
+    pred += tmp
+
+    # Fixture modifier: home advantage and difficulty adjustment
+    modifier = np.multiply(is_home == 1, model.home_bonus)
+    modifier += 1.0
+    np.multiply(difficulty <= 2, model.easy_fixture_bonus, out=tmp)
+    modifier += tmp
+    np.multiply(difficulty >= 4, model.hard_fixture_penalty, out=tmp)
+    modifier -= tmp
+    pred *= modifier
+
+    # Minimum 0 points (missing form data also scores 0)
+    pred[~(pred > 0)] = 0.0
+    return pred
+
+
+def _top_k_indices(values: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k largest values, unordered (partial selection, no full sort)."""
+    if len(values) <= k:
+        return np.arange(len(values))
+    return np.argpartition(values, -k)[-k:]
+
+
 def compare_models(
     X: pd.DataFrame,
     y: pd.Series,
@@ -123,18 +148,23 @@ def compare_models(
     simple_model = SimpleFormPredictor()
     simple_predictions = simple_model.predict(X)
 
+    actual = y.to_numpy()
+
     # Calculate MAE for both
-    lgbm_mae = np.mean(np.abs(lgbm_predictions - y))
-    simple_mae = np.mean(np.abs(simple_predictions - y))
+    lgbm_mae = np.mean(np.abs(lgbm_predictions - actual))
+    simple_mae = np.mean(np.abs(simple_predictions - actual))
 
     # Calculate top-11 overlap (the metric that matters for TOTW)
-    # Sort by predictions and get top 11
-    lgbm_top11_idx = np.argsort(lgbm_predictions)[-11:]
-    simple_top11_idx = np.argsort(simple_predictions)[-11:]
-    actual_top11_idx = np.argsort(y.values)[-11:]
-
-    lgbm_overlap = len(set(lgbm_top11_idx) & set(actual_top11_idx))
-    simple_overlap = len(set(simple_top11_idx) & set(actual_top11_idx))
+    lgbm_top11_idx = _top_k_indices(lgbm_predictions, 11)
+    simple_top11_idx = _top_k_indices(simple_predictions, 11)
+    actual_top11_idx = _top_k_indices(actual, 11)
+
+    lgbm_overlap = int(
+        np.intersect1d(lgbm_top11_idx, actual_top11_idx, assume_unique=True).size
+    )
+    simple_overlap = int(
+        np.intersect1d(simple_top11_idx, actual_top11_idx, assume_unique=True).size
+    )
 
     return {
         "lgbm_mae": lgbm_mae,
@@ -8,6 +8,7 @@ from app.models.player_stats import PlayerGWStats
 from app.models.prediction import Prediction, PredictionPlayer
 from app.models.team import Team
 from app.models.backtest import BacktestResult
+from app.models.sync_run import SyncRun
 
 __all__ = [
     "Team",
@@ -19,4 +20,5 @@ __all__ = [
     "Prediction",
     "PredictionPlayer",
     "BacktestResult",
+    "SyncRun",
 ]
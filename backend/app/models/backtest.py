@@ -2,11 +2,12 @@
 
 from datetime import datetime
 
-from sqlalchemy import DECIMAL, DateTime, ForeignKey, Integer
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import DateTime, Float, ForeignKey, Integer, select
+from sqlalchemy.orm import Mapped, column_property, mapped_column, relationship
 from sqlalchemy.sql import func
 
 from app.database import Base
+from app.models.gameweek import Gameweek
 
 
 class BacktestResult(Base):
@@ -21,11 +22,18 @@ class BacktestResult(Base):
     prediction_id: Mapped[int] = mapped_column(
         Integer, ForeignKey("predictions.id"), nullable=False, unique=True
     )
+    # Loaded with the row so schemas can validate straight from it
+    gameweek_fpl_id: Mapped[int] = column_property(
+        select(Gameweek.fpl_id)
+        .where(Gameweek.id == gameweek_id)
+        .correlate_except(Gameweek)
+        .scalar_subquery()
+    )
 
     # Metrics
     player_overlap: Mapped[int] = mapped_column(Integer, nullable=False)  # 0-11
     points_ratio: Mapped[float] = mapped_column(
-        DECIMAL(5, 4), nullable=False
+        Float, nullable=False
     )  # predicted/actual
     actual_total: Mapped[int] = mapped_column(Integer, nullable=False)
     predicted_total: Mapped[int] = mapped_column(Integer, nullable=False)
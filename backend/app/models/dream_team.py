@@ -1,6 +1,6 @@
 """Dream Team model - ground truth for predictions."""
 
-from sqlalchemy import ForeignKey, Integer, UniqueConstraint
+from sqlalchemy import ForeignKey, Index, Integer, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -29,6 +29,7 @@ class DreamTeam(Base):
 
     __table_args__ = (
         UniqueConstraint("gameweek_id", "player_id", name="uq_dream_team_gw_player"),
+        Index("ix_dream_teams_gw_points", "gameweek_id", "points"),
     )
 
     def __repr__(self) -> str:
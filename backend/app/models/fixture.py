@@ -2,7 +2,7 @@
 
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -44,5 +44,9 @@ class Fixture(Base):
         "PlayerGWStats", back_populates="fixture"
     )
 
+    __table_args__ = (
+        Index("ix_fixtures_gw_teams", "gameweek_id", "team_home_id", "team_away_id"),
+    )
+
     def __repr__(self) -> str:
         return f"<Fixture {self.team_home_id} vs {self.team_away_id}>"
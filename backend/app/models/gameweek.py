@@ -4,6 +4,7 @@ from datetime import datetime
 
 from sqlalchemy import Boolean, DateTime, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.sql import func
 
 from app.database import Base
 
@@ -20,6 +21,11 @@ class Gameweek(Base):
     finished: Mapped[bool] = mapped_column(Boolean, default=False)
     is_current: Mapped[bool] = mapped_column(Boolean, default=False)
     is_next: Mapped[bool] = mapped_column(Boolean, default=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+    # When player stats and the dream team were last ingested
+    stats_synced_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
 
     # Relationships
     fixtures: Mapped[list["Fixture"]] = relationship("Fixture", back_populates="gameweek")
@@ -1,6 +1,6 @@
 """Player gameweek stats model."""
 
-from sqlalchemy import DECIMAL, ForeignKey, Integer, UniqueConstraint
+from sqlalchemy import Float, ForeignKey, Index, Integer, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -12,11 +12,13 @@ class PlayerGWStats(Base):
     __tablename__ = "player_gw_stats"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # Indexed through uq_player_gameweek and ix_player_gw_stats_gw_points, which
+    # lead with player_id and gameweek_id respectively
     player_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("players.id"), nullable=False, index=True
+        Integer, ForeignKey("players.id"), nullable=False
     )
     gameweek_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("gameweeks.id"), nullable=False, index=True
+        Integer, ForeignKey("gameweeks.id"), nullable=False
     )
     fixture_id: Mapped[int] = mapped_column(
         Integer, ForeignKey("fixtures.id"), nullable=True
@@ -43,9 +45,9 @@ class PlayerGWStats(Base):
     key_passes: Mapped[int] = mapped_column(Integer, default=0)
 
     # xG/xA from Understat (nullable until synced)
-    xg: Mapped[float] = mapped_column(DECIMAL(5, 2), nullable=True)
-    xa: Mapped[float] = mapped_column(DECIMAL(5, 2), nullable=True)
-    npxg: Mapped[float] = mapped_column(DECIMAL(5, 2), nullable=True)
+    xg: Mapped[float] = mapped_column(Float, nullable=True)
+    xa: Mapped[float] = mapped_column(Float, nullable=True)
+    npxg: Mapped[float] = mapped_column(Float, nullable=True)
 
     # Relationships
     player: Mapped["Player"] = relationship("Player", back_populates="gw_stats")
@@ -54,6 +56,8 @@ class PlayerGWStats(Base):
 
     __table_args__ = (
         UniqueConstraint("player_id", "gameweek_id", name="uq_player_gameweek"),
+        # Covers per-gameweek points lookups without touching the table
+        Index("ix_player_gw_stats_gw_points", "gameweek_id", "total_points"),
     )
 
     def __repr__(self) -> str:
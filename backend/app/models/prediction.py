@@ -2,7 +2,7 @@
 
 from datetime import datetime
 
-from sqlalchemy import DECIMAL, DateTime, ForeignKey, Integer, String
+from sqlalchemy import DateTime, Float, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
@@ -28,12 +28,20 @@ class Prediction(Base):
     # Relationships
     gameweek: Mapped["Gameweek"] = relationship("Gameweek", back_populates="predictions")
     players: Mapped[list["PredictionPlayer"]] = relationship(
-        "PredictionPlayer", back_populates="prediction", cascade="all, delete-orphan"
+        "PredictionPlayer",
+        back_populates="prediction",
+        cascade="all, delete-orphan",
+        order_by="PredictionPlayer.position_slot",
     )
     backtest_result: Mapped["BacktestResult"] = relationship(
         "BacktestResult", back_populates="prediction", uselist=False
     )
 
+    __table_args__ = (
+        # Backtests look up predictions by gameweek and model version
+        Index("ix_predictions_gw_version", "gameweek_id", "model_version"),
+    )
+
     def __repr__(self) -> str:
         return f"<Prediction gw={self.gameweek_id} v={self.model_version}>"
 
@@ -51,14 +59,18 @@ class PredictionPlayer(Base):
         Integer, ForeignKey("players.id"), nullable=False, index=True
     )
     position_slot: Mapped[int] = mapped_column(Integer, nullable=False)  # 1-11
-    predicted_points: Mapped[float] = mapped_column(DECIMAL(5, 2), nullable=False)
-    predicted_minutes: Mapped[float] = mapped_column(DECIMAL(5, 2), nullable=True)
-    start_probability: Mapped[float] = mapped_column(DECIMAL(3, 2), nullable=True)
-    confidence: Mapped[float] = mapped_column(DECIMAL(3, 2), nullable=True)
+    predicted_points: Mapped[float] = mapped_column(Float, nullable=False)
+    predicted_minutes: Mapped[float] = mapped_column(Float, nullable=True)
+    start_probability: Mapped[float] = mapped_column(Float, nullable=True)
+    confidence: Mapped[float] = mapped_column(Float, nullable=True)
 
     # Relationships
     prediction: Mapped["Prediction"] = relationship("Prediction", back_populates="players")
     player: Mapped["Player"] = relationship("Player", back_populates="prediction_entries")
 
+    __table_args__ = (
+        Index("ix_prediction_players_pred_player", "prediction_id", "player_id"),
+    )
+
     def __repr__(self) -> str:
         return f"<PredictionPlayer pred={self.prediction_id} player={self.player_id} pts={self.predicted_points}>"
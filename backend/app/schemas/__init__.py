@@ -12,6 +12,7 @@ from app.schemas.common import (
     PredictionPlayerSchema,
     PredictionSchema,
     SyncResultSchema,
+    SyncRunSchema,
     TeamSchema,
 )
 
@@ -28,4 +29,5 @@ __all__ = [
     "BacktestResultSchema",
     "BacktestSummarySchema",
     "SyncResultSchema",
+    "SyncRunSchema",
 ]
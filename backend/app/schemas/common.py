@@ -1,8 +1,9 @@
 """Pydantic schemas for API request/response models."""
 
 from datetime import datetime
+from typing import Any
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class TeamSchema(BaseModel):
@@ -17,8 +18,7 @@ class TeamSchema(BaseModel):
     strength_defence_home: int | None
     strength_defence_away: int | None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class PlayerSchema(BaseModel):
@@ -40,8 +40,7 @@ class PlayerSchema(BaseModel):
     is_corner_taker: bool
     is_freekick_taker: bool
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class GameweekSchema(BaseModel):
@@ -55,8 +54,7 @@ class GameweekSchema(BaseModel):
     is_current: bool
     is_next: bool
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class FixtureSchema(BaseModel):
@@ -76,8 +74,7 @@ class FixtureSchema(BaseModel):
     team_a_score: int | None
     finished: bool
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class PlayerStatsSchema(BaseModel):
@@ -104,8 +101,7 @@ class PlayerStatsSchema(BaseModel):
     xa: float | None
     npxg: float | None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class DreamTeamPlayerSchema(BaseModel):
@@ -120,8 +116,7 @@ class DreamTeamPlayerSchema(BaseModel):
     position_slot: int
     points: int
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class DreamTeamSchema(BaseModel):
@@ -132,8 +127,7 @@ class DreamTeamSchema(BaseModel):
     total_points: int
     players: list[DreamTeamPlayerSchema]
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class PredictionPlayerSchema(BaseModel):
@@ -151,8 +145,7 @@ class PredictionPlayerSchema(BaseModel):
     start_probability: float | None
     confidence: float | None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class PredictionSchema(BaseModel):
@@ -167,8 +160,7 @@ class PredictionSchema(BaseModel):
     formation: str | None
     players: list[PredictionPlayerSchema]
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class BacktestResultSchema(BaseModel):
@@ -183,8 +175,7 @@ class BacktestResultSchema(BaseModel):
     predicted_team_actual: int | None = None  # Actual points scored by our predicted players
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class BacktestSummarySchema(BaseModel):
@@ -211,3 +202,17 @@ class SyncResultSchema(BaseModel):
     fixtures: int
     player_stats: int
     dream_teams: int
+
+
+class SyncRunSchema(BaseModel):
+    """Status of a background data sync."""
+
+    id: int
+    source: str
+    status: str  # pending, running, completed, failed
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    created_at: datetime
+    finished_at: datetime | None = None
+
+    model_config = ConfigDict(from_attributes=True)
@@ -1,12 +1,16 @@
 """Backtesting service for evaluating prediction accuracy."""
 
 import logging
-from decimal import Decimal
+from collections import defaultdict
+from collections.abc import Iterator
+from typing import Any
 
-from sqlalchemy.orm import Session
+from pydantic import TypeAdapter
+from sqlalchemy import and_, func, insert, select, update
+from sqlalchemy.orm import Session, selectinload
 
-from app.config import get_settings
 from app.constants import MIN_GAMEWEEKS_FOR_PREDICTION
+from app.database import loader_options
 from app.models import (
     BacktestResult,
     DreamTeam,
@@ -16,10 +20,61 @@ from app.models import (
     PredictionPlayer,
 )
 from app.schemas import BacktestResultSchema, BacktestSummarySchema
-from app.services.predictor import ModelType, generate_prediction
+from app.services.predictor import MODEL_VERSIONS, ModelType, generate_prediction
 
 logger = logging.getLogger(__name__)
-settings = get_settings()
+
+_RESULTS_ADAPTER = TypeAdapter(list[BacktestResultSchema])
+
+
+def _prediction_player_ids(db: Session, prediction_id: int) -> set[int]:
+    """IDs of the players in a prediction's XI."""
+    return set(
+        db.execute(
+            select(PredictionPlayer.player_id).where(
+                PredictionPlayer.prediction_id == prediction_id
+            )
+        ).scalars()
+    )
+
+
+def _prediction_actual_totals(
+    db: Session, prediction_ids: list[int]
+) -> dict[int, int]:
+    """
+    Actual points scored by each prediction's XI, summed in one GROUP BY query.
+
+    Each prediction's players are matched to their stats for the
+    prediction's own gameweek.
+
+    Args:
+        db: Database session
+        prediction_ids: IDs of the predictions to total
+
+    Returns:
+        Total actual points keyed by prediction ID (predictions without
+        players produce no entry)
+    """
+    if not prediction_ids:
+        return {}
+
+    rows = db.execute(
+        select(
+            PredictionPlayer.prediction_id,
+            func.coalesce(func.sum(PlayerGWStats.total_points), 0),
+        )
+        .join(Prediction, Prediction.id == PredictionPlayer.prediction_id)
+        .outerjoin(
+            PlayerGWStats,
+            and_(
+                PlayerGWStats.player_id == PredictionPlayer.player_id,
+                PlayerGWStats.gameweek_id == Prediction.gameweek_id,
+            ),
+        )
+        .where(PredictionPlayer.prediction_id.in_(prediction_ids))
+        .group_by(PredictionPlayer.prediction_id)
+    )
+    return dict(rows.all())
 
 
 def run_backtest(
@@ -45,6 +100,28 @@ def run_backtest(
     Returns:
         BacktestSummarySchema with results
     """
+    raw_results = list(
+        iter_backtest(db, start_gw, end_gw, model_type, force_regenerate)
+    )
+    return summarize_results(_RESULTS_ADAPTER.validate_python(raw_results))
+
+
+def iter_backtest(
+    db: Session,
+    start_gw: int,
+    end_gw: int | None = None,
+    model_type: ModelType = "ensemble",
+    force_regenerate: bool = False,
+) -> Iterator[dict[str, Any]]:
+    """
+    Run backtesting across multiple gameweeks, one gameweek at a time.
+
+    Takes the same arguments as run_backtest. Backtest results are written
+    in a single commit once the last gameweek is done.
+
+    Yields:
+        Each gameweek's result (BacktestResultSchema fields) as it completes
+    """
     # Determine end gameweek if not specified
     if end_gw is None:
         last_finished = (
@@ -56,16 +133,7 @@ def run_backtest(
         if last_finished:
             end_gw = last_finished.fpl_id
         else:
-            return BacktestSummarySchema(
-                total_gameweeks=0,
-                avg_overlap=0.0,
-                avg_points_ratio=0.0,
-                min_overlap=0,
-                max_overlap=0,
-                weeks_above_9=0,
-                weeks_above_8=0,
-                results=[],
-            )
+            return
 
     # Ensure start_gw is valid
     min_valid_start = MIN_GAMEWEEKS_FOR_PREDICTION + 1
@@ -75,35 +143,81 @@ def run_backtest(
         )
         start_gw = min_valid_start
 
-    results: list[BacktestResultSchema] = []
+    # Load every gameweek in range with its dream team, and the predictions
+    # that can be reused, up front rather than once per gameweek. Read-only
+    # data is selected as plain rows; only predictions are ORM objects, as
+    # their backtest results are written (or they are deleted).
+    gameweeks = {
+        row.fpl_id: row
+        for row in db.execute(
+            select(Gameweek.id, Gameweek.fpl_id, Gameweek.finished).where(
+                Gameweek.fpl_id.between(start_gw, end_gw)
+            )
+        )
+    }
+    gameweek_ids = [row.id for row in gameweeks.values()]
+
+    # Player IDs and total points of each dream team, built once per gameweek
+    dream_team_ids: dict[int, set[int]] = defaultdict(set)
+    dream_team_points: dict[int, int] = defaultdict(int)
+    for gameweek_id, player_id, points in db.execute(
+        select(DreamTeam.gameweek_id, DreamTeam.player_id, DreamTeam.points).where(
+            DreamTeam.gameweek_id.in_(gameweek_ids)
+        )
+    ):
+        dream_team_ids[gameweek_id].add(player_id)
+        dream_team_points[gameweek_id] += points
+
+    expected_version = MODEL_VERSIONS[model_type]
+    prediction_options = [selectinload(Prediction.backtest_result)]
+    if force_regenerate:
+        # Players are deleted along with their prediction
+        prediction_options.append(selectinload(Prediction.players))
+    existing_predictions: dict[int, Prediction] = {}
+    for p in (
+        db.query(Prediction)
+        .options(*loader_options(*prediction_options))
+        .filter(
+            Prediction.gameweek_id.in_(gameweek_ids),
+            Prediction.model_version == expected_version,
+        )
+        .order_by(Prediction.id)
+    ):
+        existing_predictions.setdefault(p.gameweek_id, p)
+
+    prediction_players: dict[int, set[int]] = defaultdict(set)
+    team_actuals: dict[int, int] = {}
+    if existing_predictions and not force_regenerate:
+        reused_ids = [p.id for p in existing_predictions.values()]
+        for prediction_id, player_id in db.execute(
+            select(PredictionPlayer.prediction_id, PredictionPlayer.player_id).where(
+                PredictionPlayer.prediction_id.in_(reused_ids)
+            )
+        ):
+            prediction_players[prediction_id].add(player_id)
+        team_actuals = _prediction_actual_totals(db, reused_ids)
+
+    # Backtest result rows to write in bulk once every gameweek is done
+    results_to_insert: list[dict[str, Any]] = []
+    results_to_update: list[dict[str, Any]] = []
 
     for gw in range(start_gw, end_gw + 1):
         logger.info(f"Backtesting GW {gw}...")
 
         # Check if we have dream team data for this GW
-        gw_db = db.query(Gameweek).filter(Gameweek.fpl_id == gw).first()
+        gw_db = gameweeks.get(gw)
         if not gw_db or not gw_db.finished:
             logger.info(f"Skipping GW {gw} - not finished")
             continue
 
-        dream_team_entries = (
-            db.query(DreamTeam).filter(DreamTeam.gameweek_id == gw_db.id).all()
-        )
-        if len(dream_team_entries) != 11:
+        # Dream team players are unique per gameweek (uq_dream_team_gw_player)
+        actual_player_ids = dream_team_ids[gw_db.id]
+        if len(actual_player_ids) != 11:
             logger.info(f"Skipping GW {gw} - incomplete dream team data")
             continue
 
         # Check if we already have a prediction for this GW with matching model_version
-        # Model version format: "{settings.model_version}-{model_type}"
-        expected_version = f"{settings.model_version}-{model_type}"
-        existing_prediction = (
-            db.query(Prediction)
-            .filter(
-                Prediction.gameweek_id == gw_db.id,
-                Prediction.model_version == expected_version,
-            )
-            .first()
-        )
+        existing_prediction = existing_predictions.get(gw_db.id)
 
         if existing_prediction and not force_regenerate:
             prediction = existing_prediction
@@ -115,100 +229,54 @@ def run_backtest(
             # Delete existing prediction if force_regenerate
             if existing_prediction and force_regenerate:
                 # Also delete associated backtest result
-                db.query(BacktestResult).filter(
-                    BacktestResult.prediction_id == existing_prediction.id
-                ).delete()
-                # Delete prediction players
-                db.query(PredictionPlayer).filter(
-                    PredictionPlayer.prediction_id == existing_prediction.id
-                ).delete()
-                # Delete prediction
+                if existing_prediction.backtest_result:
+                    db.delete(existing_prediction.backtest_result)
+                # Delete prediction (its players cascade with it)
                 db.delete(existing_prediction)
-                db.commit()
 
             # Generate prediction with specified model type
-            prediction = generate_prediction(db, gw, model_type=model_type)
-            if not prediction:
+            generated = generate_prediction(db, gw, model_type=model_type)
+            if not generated:
                 logger.warning(f"Could not generate prediction for GW {gw}")
                 continue
+            prediction = generated.prediction
+            prediction_players[prediction.id] = set(generated.player_ids)
+            team_actuals.update(_prediction_actual_totals(db, [prediction.id]))
 
         # Get predicted player IDs
-        pred_players = (
-            db.query(PredictionPlayer)
-            .filter(PredictionPlayer.prediction_id == prediction.id)
-            .all()
-        )
-        predicted_player_ids = {pp.player_id for pp in pred_players}
-
-        # Get actual dream team player IDs
-        actual_player_ids = {dt.player_id for dt in dream_team_entries}
+        predicted_player_ids = prediction_players[prediction.id]
 
         # Calculate overlap
         overlap = len(predicted_player_ids & actual_player_ids)
 
         # Calculate points
         predicted_total = prediction.total_predicted_points or 0
-        actual_total = sum(dt.points for dt in dream_team_entries)
+        actual_total = dream_team_points[gw_db.id]
 
         # Calculate actual points scored by our predicted team
-        predicted_team_actual = 0
-        for pp in pred_players:
-            # Get the actual stats for this player in this gameweek
-            actual_stats = (
-                db.query(PlayerGWStats)
-                .filter(
-                    PlayerGWStats.player_id == pp.player_id,
-                    PlayerGWStats.gameweek_id == gw_db.id,
-                )
-                .first()
-            )
-            if actual_stats:
-                predicted_team_actual += actual_stats.total_points
+        predicted_team_actual = team_actuals.get(prediction.id, 0)
 
         # Calculate points ratio (avoid division by zero)
         points_ratio = (
             predicted_total / actual_total if actual_total > 0 else 0.0
         )
 
+        metrics = {
+            "player_overlap": overlap,
+            "points_ratio": points_ratio,
+            "actual_total": actual_total,
+            "predicted_total": predicted_total,
+        }
+
         # Check if backtest result already exists
-        existing_result = (
-            db.query(BacktestResult)
-            .filter(BacktestResult.prediction_id == prediction.id)
-            .first()
-        )
+        existing_result = prediction.backtest_result
 
         if existing_result:
-            # Update existing
-            existing_result.player_overlap = overlap
-            existing_result.points_ratio = Decimal(str(points_ratio))
-            existing_result.actual_total = actual_total
-            existing_result.predicted_total = predicted_total
+            results_to_update.append({"id": existing_result.id, **metrics})
         else:
-            # Create new backtest result
-            bt_result = BacktestResult(
-                gameweek_id=gw_db.id,
-                prediction_id=prediction.id,
-                player_overlap=overlap,
-                points_ratio=Decimal(str(points_ratio)),
-                actual_total=actual_total,
-                predicted_total=predicted_total,
-            )
-            db.add(bt_result)
-
-        db.commit()
-
-        results.append(
-            BacktestResultSchema(
-                gameweek_id=gw_db.id,
-                gameweek_fpl_id=gw,
-                player_overlap=overlap,
-                points_ratio=points_ratio,
-                actual_total=actual_total,
-                predicted_total=predicted_total,
-                predicted_team_actual=predicted_team_actual,
-                created_at=prediction.created_at,
+            results_to_insert.append(
+                {"gameweek_id": gw_db.id, "prediction_id": prediction.id, **metrics}
             )
-        )
 
         logger.info(
             f"GW {gw}: Overlap {overlap}/11, "
@@ -216,48 +284,106 @@ def run_backtest(
             f"Predicted {predicted_total}, Actual {actual_total}"
         )
 
-    # Calculate summary stats
-    if not results:
+        yield {
+            "gameweek_id": gw_db.id,
+            "gameweek_fpl_id": gw,
+            "player_overlap": overlap,
+            "points_ratio": points_ratio,
+            "actual_total": actual_total,
+            "predicted_total": predicted_total,
+            "predicted_team_actual": predicted_team_actual,
+            "created_at": prediction.created_at,
+        }
+
+    # Backtest results are written with one executemany per statement and a
+    # single commit. Force-regenerate deletes are not part of it:
+    # generate_prediction commits each regenerated gameweek as it goes.
+    if results_to_insert:
+        db.execute(insert(BacktestResult), results_to_insert)
+    if results_to_update:
+        db.execute(update(BacktestResult), results_to_update)
+    db.commit()
+
+
+class BacktestSummaryAccumulator:
+    """
+    Running summary statistics over backtest results.
+
+    Results are added one at a time, so a summary can be produced without
+    holding every result (e.g. while streaming them).
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.overlap_sum = 0
+        self.ratio_sum = 0
+        self.dream_team_sum = 0
+        self.team_actual_sum = 0
+        self.team_actual_count = 0
+        self.min_overlap: int | None = None
+        self.max_overlap: int | None = None
+        self.weeks_above_9 = 0
+        self.weeks_above_8 = 0
+
+    def add(self, result: BacktestResultSchema) -> None:
+        """Fold one gameweek's result into the statistics."""
+        overlap = result.player_overlap
+        self.count += 1
+        self.overlap_sum += overlap
+        self.ratio_sum += result.points_ratio
+        self.dream_team_sum += result.actual_total
+        if result.predicted_team_actual is not None:
+            self.team_actual_sum += result.predicted_team_actual
+            self.team_actual_count += 1
+        if self.min_overlap is None or overlap < self.min_overlap:
+            self.min_overlap = overlap
+        if self.max_overlap is None or overlap > self.max_overlap:
+            self.max_overlap = overlap
+        self.weeks_above_9 += overlap >= 9
+        self.weeks_above_8 += overlap >= 8
+
+    def summary(
+        self, results: list[BacktestResultSchema] | None = None
+    ) -> BacktestSummarySchema:
+        """Build the summary schema, optionally carrying the results."""
+        if not self.count:
+            return BacktestSummarySchema(
+                total_gameweeks=0,
+                avg_overlap=0.0,
+                avg_points_ratio=0.0,
+                avg_predicted_team_actual=None,
+                avg_dream_team_points=None,
+                min_overlap=0,
+                max_overlap=0,
+                weeks_above_9=0,
+                weeks_above_8=0,
+                results=[],
+            )
+
         return BacktestSummarySchema(
-            total_gameweeks=0,
-            avg_overlap=0.0,
-            avg_points_ratio=0.0,
-            avg_predicted_team_actual=None,
-            avg_dream_team_points=None,
-            min_overlap=0,
-            max_overlap=0,
-            weeks_above_9=0,
-            weeks_above_8=0,
-            results=[],
+            total_gameweeks=self.count,
+            avg_overlap=self.overlap_sum / self.count,
+            avg_points_ratio=self.ratio_sum / self.count,
+            avg_predicted_team_actual=(
+                self.team_actual_sum / self.team_actual_count
+                if self.team_actual_count
+                else None
+            ),
+            avg_dream_team_points=self.dream_team_sum / self.count,
+            min_overlap=self.min_overlap,
+            max_overlap=self.max_overlap,
+            weeks_above_9=self.weeks_above_9,
+            weeks_above_8=self.weeks_above_8,
+            results=results or [],
         )
 
-    overlaps = [r.player_overlap for r in results]
-    ratios = [r.points_ratio for r in results]
-    predicted_team_actuals = [
-        r.predicted_team_actual for r in results if r.predicted_team_actual is not None
-    ]
-    dream_team_points = [r.actual_total for r in results]
-
-    return BacktestSummarySchema(
-        total_gameweeks=len(results),
-        avg_overlap=sum(overlaps) / len(overlaps),
-        avg_points_ratio=sum(ratios) / len(ratios),
-        avg_predicted_team_actual=(
-            sum(predicted_team_actuals) / len(predicted_team_actuals)
-            if predicted_team_actuals
-            else None
-        ),
-        avg_dream_team_points=(
-            sum(dream_team_points) / len(dream_team_points)
-            if dream_team_points
-            else None
-        ),
-        min_overlap=min(overlaps),
-        max_overlap=max(overlaps),
-        weeks_above_9=sum(1 for o in overlaps if o >= 9),
-        weeks_above_8=sum(1 for o in overlaps if o >= 8),
-        results=results,
-    )
+
+def summarize_results(results: list[BacktestResultSchema]) -> BacktestSummarySchema:
+    """Compute summary statistics over per-gameweek backtest results in one pass."""
+    summary = BacktestSummaryAccumulator()
+    for r in results:
+        summary.add(r)
+    return summary.summary(results)
 
 
 def evaluate_single_prediction(
@@ -274,45 +400,40 @@ def evaluate_single_prediction(
     Returns:
         BacktestResultSchema or None if not possible
     """
-    prediction = db.query(Prediction).filter(Prediction.id == prediction_id).first()
-    if not prediction:
+    # Prediction and its gameweek in one round trip
+    row = (
+        db.query(Prediction, Gameweek)
+        .join(Prediction.gameweek)
+        .filter(Prediction.id == prediction_id)
+        .first()
+    )
+    if not row:
         return None
 
-    gw = db.query(Gameweek).filter(Gameweek.id == prediction.gameweek_id).first()
-    if not gw or not gw.finished:
+    prediction, gw = row
+    if not gw.finished:
         return None
 
-    dream_team = db.query(DreamTeam).filter(DreamTeam.gameweek_id == gw.id).all()
+    dream_team = db.execute(
+        select(DreamTeam.player_id, DreamTeam.points).where(
+            DreamTeam.gameweek_id == gw.id
+        )
+    ).all()
     if len(dream_team) != 11:
         return None
 
-    pred_players = (
-        db.query(PredictionPlayer)
-        .filter(PredictionPlayer.prediction_id == prediction.id)
-        .all()
-    )
-
-    predicted_ids = {pp.player_id for pp in pred_players}
-    actual_ids = {dt.player_id for dt in dream_team}
+    predicted_ids = _prediction_player_ids(db, prediction.id)
+    dream_team_player_ids, dream_team_points = zip(*dream_team)
+    actual_ids = set(dream_team_player_ids)
 
     overlap = len(predicted_ids & actual_ids)
-    actual_total = sum(dt.points for dt in dream_team)
+    actual_total = sum(dream_team_points)
     predicted_total = prediction.total_predicted_points or 0
     points_ratio = predicted_total / actual_total if actual_total > 0 else 0.0
 
     # Calculate actual points scored by our predicted team
-    predicted_team_actual = 0
-    for pp in pred_players:
-        actual_stats = (
-            db.query(PlayerGWStats)
-            .filter(
-                PlayerGWStats.player_id == pp.player_id,
-                PlayerGWStats.gameweek_id == gw.id,
-            )
-            .first()
-        )
-        if actual_stats:
-            predicted_team_actual += actual_stats.total_points
+    team_actuals = _prediction_actual_totals(db, [prediction.id])
+    predicted_team_actual = team_actuals.get(prediction.id, 0)
 
     return BacktestResultSchema(
         gameweek_id=gw.id,
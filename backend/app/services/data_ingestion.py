@@ -1,8 +1,12 @@
 """Data ingestion service for syncing FPL data to database."""
 
+import asyncio
 import logging
 from typing import Any
 
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
 from app.models import (
@@ -14,6 +18,7 @@ from app.models import (
     Team,
 )
 from app.services.fpl_client import (
+    AsyncFPLClient,
     FPLClient,
     get_position_from_element_type,
     parse_fpl_datetime,
@@ -21,9 +26,85 @@ from app.services.fpl_client import (
 
 logger = logging.getLogger(__name__)
 
+# Rows per INSERT ... ON CONFLICT statement, keeping bind parameters well
+# under the PostgreSQL and SQLite limits
+UPSERT_BATCH_SIZE = 1000
+
+# Live payload stats copied onto PlayerGWStats columns of the same name
+_LIVE_STAT_KEYS = (
+    "minutes",
+    "goals_scored",
+    "assists",
+    "clean_sheets",
+    "goals_conceded",
+    "own_goals",
+    "penalties_saved",
+    "penalties_missed",
+    "yellow_cards",
+    "red_cards",
+    "saves",
+    "bonus",
+    "bps",
+    "total_points",
+)
+
+
+def upsert_rows(
+    db: Session,
+    model: type,
+    rows: list[dict[str, Any]],
+    index_elements: list[str],
+) -> None:
+    """
+    Insert rows, updating the existing row on a unique-key conflict.
+
+    Issues one INSERT ... ON CONFLICT DO UPDATE per batch instead of a
+    SELECT and an INSERT/UPDATE per row. Conflicting rows are only rewritten
+    when a value actually changed, and onupdate columns (e.g. updated_at)
+    are bumped in that case as the ORM would.
+
+    Args:
+        db: Database session
+        model: Mapped class of the target table
+        rows: Column values per row; every row must have the same keys
+        index_elements: Columns of the unique constraint to match on
+    """
+    if not rows:
+        return
+
+    table = model.__table__
+    insert = sqlite_insert if db.get_bind().dialect.name == "sqlite" else pg_insert
+    update_columns = [key for key in rows[0] if key not in index_elements]
+
+    for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+        stmt = insert(table).values(rows[start : start + UPSERT_BATCH_SIZE])
+        set_ = {key: stmt.excluded[key] for key in update_columns}
+        set_.update(
+            (column.name, column.onupdate.arg)
+            for column in table.columns
+            if column.onupdate is not None and column.name not in set_
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=index_elements,
+            set_=set_,
+            where=or_(
+                *(
+                    table.c[key].is_distinct_from(stmt.excluded[key])
+                    for key in update_columns
+                )
+            ),
+        )
+        db.execute(stmt)
+
 
 class DataIngestionService:
-    """Service for ingesting FPL data into the database."""
+    """
+    Service for ingesting FPL data into the database.
+
+    Create one per sync with its own session and close it afterwards; the
+    session holds a pooled connection for the whole sync, including the
+    time spent waiting on the FPL API.
+    """
 
     def __init__(self, db: Session):
         self.db = db
@@ -54,12 +135,28 @@ class DataIngestionService:
         teams_count = self._sync_teams(bootstrap["teams"])
         gameweeks_count = self._sync_gameweeks(bootstrap["events"])
         players_count = self._sync_players(bootstrap["elements"])
-        fixtures_count = self._sync_fixtures()
-        stats_count = self._sync_all_player_stats()
-        dream_team_count = self._sync_all_dream_teams()
+
+        # Everything else only depends on which gameweeks need syncing, so it
+        # is fetched concurrently up front and then written serially
+        finished_gws = self._gameweeks_to_sync()
+        payloads = self._fetch_all(finished_gws)
+
+        fixtures_count = self._sync_fixtures(payloads["fixtures"])
+        stats_count = self._sync_all_player_stats(finished_gws, payloads["live"])
+        dream_team_count = self._sync_all_dream_teams(
+            finished_gws, payloads["dream_teams"]
+        )
+        # A failed dream team fetch leaves its gameweek due for the next sync
+        self._mark_stats_synced(
+            [
+                gw.id
+                for gw, dream_team_data in zip(finished_gws, payloads["dream_teams"])
+                if not isinstance(dream_team_data, Exception)
+            ]
+        )
 
         # Sync set piece takers
-        self._sync_set_piece_takers()
+        self._sync_set_piece_takers(payloads["set_piece_notes"])
 
         self.db.commit()
 
@@ -72,153 +169,243 @@ class DataIngestionService:
             "dream_teams": dream_team_count,
         }
 
+    def _id_map(self, model: type) -> dict[int, int]:
+        """Map FPL IDs to database IDs for every row of a table, in one query."""
+        return dict(self.db.execute(select(model.fpl_id, model.id)).all())
+
+    def _gameweeks_to_sync(self) -> list[Any]:
+        """
+        (id, fpl_id, is_current, stats_synced_at) rows of finished gameweeks
+        needing a sync.
+
+        Finished gameweeks are immutable, so one is only re-synced if it was
+        never synced or its row changed since (e.g. it just finished). The
+        current gameweek is always re-synced, as bonus points are confirmed
+        after it finishes.
+        """
+        return self.db.execute(
+            select(
+                Gameweek.id,
+                Gameweek.fpl_id,
+                Gameweek.is_current,
+                Gameweek.stats_synced_at,
+            ).where(
+                Gameweek.finished == True,  # noqa: E712
+                or_(
+                    Gameweek.stats_synced_at.is_(None),
+                    Gameweek.stats_synced_at < Gameweek.updated_at,
+                    Gameweek.is_current == True,  # noqa: E712
+                ),
+            )
+        ).all()
+
+    def _mark_stats_synced(self, gameweek_ids: list[int]) -> None:
+        """Record that the given gameweeks' stats were just synced."""
+        if not gameweek_ids:
+            return
+        self.db.execute(
+            update(Gameweek)
+            .where(Gameweek.id.in_(gameweek_ids))
+            # Keep updated_at as is; it versions the cached gameweek list
+            .values(stats_synced_at=func.now(), updated_at=Gameweek.updated_at)
+        )
+
+    @staticmethod
+    def _fetch_all(gameweeks: list[Any]) -> dict[str, Any]:
+        """
+        Fetch every payload the sync needs after bootstrap, concurrently.
+
+        Args:
+            gameweeks: Rows from _gameweeks_to_sync
+
+        Returns:
+            Dict with "fixtures", "set_piece_notes", and per-gameweek
+            "live" and "dream_teams" lists in gameweeks order.
+            A failed fetch is returned as its exception, so callers decide
+            whether it is fatal.
+        """
+
+        # Only finished gameweeks are synced, so past ones can be served from
+        # the response cache; the current one may still have its bonus points
+        # confirmed. A past gameweek that was synced before has changed since
+        # (e.g. it was current then), so any cached response for it may hold
+        # provisional bonus and is refetched.
+        options = [
+            {
+                "finished": not gw.is_current,
+                "refresh": not gw.is_current and gw.stats_synced_at is not None,
+            }
+            for gw in gameweeks
+        ]
+
+        async def fetch_all() -> list[Any]:
+            async with AsyncFPLClient() as client:
+                return await asyncio.gather(
+                    client.get_fixtures(),
+                    client.get_set_piece_notes(),
+                    *(
+                        client.get_gameweek_live(gw.fpl_id, **opts)
+                        for gw, opts in zip(gameweeks, options)
+                    ),
+                    *(
+                        client.get_dream_team(gw.fpl_id, **opts)
+                        for gw, opts in zip(gameweeks, options)
+                    ),
+                    return_exceptions=True,
+                )
+
+        results = asyncio.run(fetch_all())
+        n = len(gameweeks)
+        return {
+            "fixtures": results[0],
+            "set_piece_notes": results[1],
+            "live": results[2 : 2 + n],
+            "dream_teams": results[2 + n :],
+        }
+
     def _sync_teams(self, teams_data: list[dict[str, Any]]) -> int:
         """Sync teams from FPL data."""
         logger.info(f"Syncing {len(teams_data)} teams")
-        count = 0
 
-        for team_data in teams_data:
-            team = self.db.query(Team).filter(Team.fpl_id == team_data["id"]).first()
-
-            if not team:
-                team = Team(fpl_id=team_data["id"])
-                self.db.add(team)
-
-            team.name = team_data["name"]
-            team.short_name = team_data["short_name"]
-            team.strength_attack_home = team_data.get("strength_attack_home")
-            team.strength_attack_away = team_data.get("strength_attack_away")
-            team.strength_defence_home = team_data.get("strength_defence_home")
-            team.strength_defence_away = team_data.get("strength_defence_away")
-            count += 1
+        rows = [
+            {
+                "fpl_id": team_data["id"],
+                "name": team_data["name"],
+                "short_name": team_data["short_name"],
+                "strength_attack_home": team_data.get("strength_attack_home"),
+                "strength_attack_away": team_data.get("strength_attack_away"),
+                "strength_defence_home": team_data.get("strength_defence_home"),
+                "strength_defence_away": team_data.get("strength_defence_away"),
+            }
+            for team_data in teams_data
+        ]
+        upsert_rows(self.db, Team, rows, ["fpl_id"])
 
-        self.db.flush()
+        count = len(rows)
         logger.info(f"Synced {count} teams")
         return count
 
     def _sync_gameweeks(self, events_data: list[dict[str, Any]]) -> int:
         """Sync gameweeks from FPL data."""
         logger.info(f"Syncing {len(events_data)} gameweeks")
-        count = 0
 
-        for event_data in events_data:
-            gw = (
-                self.db.query(Gameweek)
-                .filter(Gameweek.fpl_id == event_data["id"])
-                .first()
-            )
-
-            if not gw:
-                gw = Gameweek(fpl_id=event_data["id"])
-                self.db.add(gw)
-
-            gw.name = event_data.get("name")
-            gw.deadline = parse_fpl_datetime(event_data.get("deadline_time"))
-            gw.finished = event_data.get("finished", False)
-            gw.is_current = event_data.get("is_current", False)
-            gw.is_next = event_data.get("is_next", False)
-            count += 1
+        rows = [
+            {
+                "fpl_id": event_data["id"],
+                "name": event_data.get("name"),
+                "deadline": parse_fpl_datetime(event_data.get("deadline_time")),
+                "finished": event_data.get("finished", False),
+                "is_current": event_data.get("is_current", False),
+                "is_next": event_data.get("is_next", False),
+            }
+            for event_data in events_data
+        ]
+        upsert_rows(self.db, Gameweek, rows, ["fpl_id"])
 
-        self.db.flush()
+        count = len(rows)
         logger.info(f"Synced {count} gameweeks")
         return count
 
     def _sync_players(self, elements_data: list[dict[str, Any]]) -> int:
         """Sync players from FPL data."""
         logger.info(f"Syncing {len(elements_data)} players")
-        count = 0
 
         # Build team fpl_id to db id mapping
-        teams = self.db.query(Team).all()
-        team_map = {t.fpl_id: t.id for t in teams}
-
-        for elem_data in elements_data:
-            player = (
-                self.db.query(Player).filter(Player.fpl_id == elem_data["id"]).first()
-            )
+        team_map = self._id_map(Team)
 
-            if not player:
-                player = Player(fpl_id=elem_data["id"])
-                self.db.add(player)
-
-            player.team_id = team_map.get(elem_data["team"])
-            player.web_name = elem_data["web_name"]
-            player.first_name = elem_data.get("first_name")
-            player.second_name = elem_data.get("second_name")
-            player.position = get_position_from_element_type(elem_data["element_type"])
-            player.now_cost = elem_data.get("now_cost")
-            player.status = elem_data.get("status")
-            player.chance_of_playing = elem_data.get("chance_of_playing_next_round")
-            player.news = elem_data.get("news")
-            count += 1
+        rows = [
+            {
+                "fpl_id": elem_data["id"],
+                "team_id": team_map.get(elem_data["team"]),
+                "web_name": elem_data["web_name"],
+                "first_name": elem_data.get("first_name"),
+                "second_name": elem_data.get("second_name"),
+                "position": get_position_from_element_type(elem_data["element_type"]),
+                "now_cost": elem_data.get("now_cost"),
+                "status": elem_data.get("status"),
+                "chance_of_playing": elem_data.get("chance_of_playing_next_round"),
+                "news": elem_data.get("news"),
+            }
+            for elem_data in elements_data
+        ]
+        upsert_rows(self.db, Player, rows, ["fpl_id"])
 
-        self.db.flush()
+        count = len(rows)
         logger.info(f"Synced {count} players")
         return count
 
-    def _sync_fixtures(self) -> int:
-        """Sync all fixtures."""
-        fixtures_data = self.fpl_client.get_fixtures()
+    def _sync_fixtures(self, fixtures_data: list[dict[str, Any]] | Exception) -> int:
+        """Sync all fixtures from the FPL fixtures payload."""
+        if isinstance(fixtures_data, Exception):
+            raise fixtures_data
         logger.info(f"Syncing {len(fixtures_data)} fixtures")
-        count = 0
 
         # Build mappings
-        teams = self.db.query(Team).all()
-        team_map = {t.fpl_id: t.id for t in teams}
-        gameweeks = self.db.query(Gameweek).all()
-        gw_map = {g.fpl_id: g.id for g in gameweeks}
-
-        for fix_data in fixtures_data:
-            fixture = (
-                self.db.query(Fixture).filter(Fixture.fpl_id == fix_data["id"]).first()
-            )
+        team_map = self._id_map(Team)
+        gw_map = self._id_map(Gameweek)
 
-            if not fixture:
-                fixture = Fixture(fpl_id=fix_data["id"])
-                self.db.add(fixture)
-
-            fixture.gameweek_id = gw_map.get(fix_data.get("event"))
-            fixture.team_home_id = team_map[fix_data["team_h"]]
-            fixture.team_away_id = team_map[fix_data["team_a"]]
-            fixture.kickoff_time = parse_fpl_datetime(fix_data.get("kickoff_time"))
-            fixture.difficulty_home = fix_data.get("team_h_difficulty")
-            fixture.difficulty_away = fix_data.get("team_a_difficulty")
-            fixture.team_h_score = fix_data.get("team_h_score")
-            fixture.team_a_score = fix_data.get("team_a_score")
-            fixture.finished = fix_data.get("finished", False)
-            count += 1
+        rows = [
+            {
+                "fpl_id": fix_data["id"],
+                "gameweek_id": gw_map.get(fix_data.get("event")),
+                "team_home_id": team_map[fix_data["team_h"]],
+                "team_away_id": team_map[fix_data["team_a"]],
+                "kickoff_time": parse_fpl_datetime(fix_data.get("kickoff_time")),
+                "difficulty_home": fix_data.get("team_h_difficulty"),
+                "difficulty_away": fix_data.get("team_a_difficulty"),
+                "team_h_score": fix_data.get("team_h_score"),
+                "team_a_score": fix_data.get("team_a_score"),
+                "finished": fix_data.get("finished", False),
+            }
+            for fix_data in fixtures_data
+        ]
+        upsert_rows(self.db, Fixture, rows, ["fpl_id"])
 
-        self.db.flush()
+        count = len(rows)
         logger.info(f"Synced {count} fixtures")
         return count
 
-    def _sync_all_player_stats(self) -> int:
-        """Sync player stats for all finished gameweeks."""
-        finished_gws = (
-            self.db.query(Gameweek).filter(Gameweek.finished == True).all()  # noqa: E712
-        )
+    def _sync_all_player_stats(
+        self, finished_gws: list[Any], payloads: list[Any]
+    ) -> int:
+        """
+        Sync player stats for all finished gameweeks.
+
+        Args:
+            finished_gws: Rows from _gameweeks_to_sync
+            payloads: Each gameweek's live payload (or fetch error), in order
+        """
         logger.info(f"Syncing player stats for {len(finished_gws)} finished gameweeks")
 
+        # Built once for every gameweek rather than per gameweek
+        player_map = self._id_map(Player)
+
         total_count = 0
-        for gw in finished_gws:
-            count = self._sync_gameweek_stats(gw.fpl_id)
+        for gw, live_data in zip(finished_gws, payloads):
+            if isinstance(live_data, Exception):
+                raise live_data
+            count = self._sync_gameweek_stats(live_data, gw.id, player_map)
             total_count += count
 
         return total_count
 
-    def _sync_gameweek_stats(self, gw_fpl_id: int) -> int:
-        """Sync player stats for a single gameweek."""
-        live_data = self.fpl_client.get_gameweek_live(gw_fpl_id)
-        elements = live_data.get("elements", [])
+    def _sync_gameweek_stats(
+        self,
+        live_data: dict[str, Any],
+        gameweek_id: int,
+        player_map: dict[int, int],
+    ) -> int:
+        """
+        Sync player stats for a single gameweek.
 
-        # Build mappings
-        players = self.db.query(Player).all()
-        player_map = {p.fpl_id: p.id for p in players}
-        gw = self.db.query(Gameweek).filter(Gameweek.fpl_id == gw_fpl_id).first()
-        if not gw:
-            return 0
+        Args:
+            live_data: The gameweek's live payload from the FPL API
+            gameweek_id: Database ID of the gameweek
+            player_map: Player FPL ID to database ID mapping
+        """
+        elements = live_data.get("elements", [])
 
-        count = 0
+        rows = []
         for elem in elements:
             player_fpl_id = elem["id"]
             player_db_id = player_map.get(player_fpl_id)
@@ -230,107 +417,84 @@ class DataIngestionService:
                 # Skip players who didn't play
                 continue
 
-            # Check if stats already exist
-            existing = (
-                self.db.query(PlayerGWStats)
-                .filter(
-                    PlayerGWStats.player_id == player_db_id,
-                    PlayerGWStats.gameweek_id == gw.id,
-                )
-                .first()
-            )
+            row = {"player_id": player_db_id, "gameweek_id": gameweek_id}
+            row.update((key, stats.get(key, 0)) for key in _LIVE_STAT_KEYS)
+            rows.append(row)
 
-            if not existing:
-                existing = PlayerGWStats(player_id=player_db_id, gameweek_id=gw.id)
-                self.db.add(existing)
-
-            # Update stats
-            existing.minutes = stats.get("minutes", 0)
-            existing.goals_scored = stats.get("goals_scored", 0)
-            existing.assists = stats.get("assists", 0)
-            existing.clean_sheets = stats.get("clean_sheets", 0)
-            existing.goals_conceded = stats.get("goals_conceded", 0)
-            existing.own_goals = stats.get("own_goals", 0)
-            existing.penalties_saved = stats.get("penalties_saved", 0)
-            existing.penalties_missed = stats.get("penalties_missed", 0)
-            existing.yellow_cards = stats.get("yellow_cards", 0)
-            existing.red_cards = stats.get("red_cards", 0)
-            existing.saves = stats.get("saves", 0)
-            existing.bonus = stats.get("bonus", 0)
-            existing.bps = stats.get("bps", 0)
-            existing.total_points = stats.get("total_points", 0)
-            count += 1
+        # Understat columns (xg, xa, ...) are left untouched on existing rows
+        upsert_rows(self.db, PlayerGWStats, rows, ["player_id", "gameweek_id"])
+        return len(rows)
 
-        self.db.flush()
-        return count
+    def _sync_all_dream_teams(
+        self, finished_gws: list[Any], payloads: list[Any]
+    ) -> int:
+        """
+        Sync dream teams for all finished gameweeks.
 
-    def _sync_all_dream_teams(self) -> int:
-        """Sync dream teams for all finished gameweeks."""
-        finished_gws = (
-            self.db.query(Gameweek).filter(Gameweek.finished == True).all()  # noqa: E712
-        )
+        Args:
+            finished_gws: Rows from _gameweeks_to_sync
+            payloads: Each gameweek's dream team payload (or fetch error)
+        """
         logger.info(f"Syncing dream teams for {len(finished_gws)} finished gameweeks")
 
+        # Built once for every gameweek rather than per gameweek
+        player_map = self._id_map(Player)
+
         total_count = 0
-        for gw in finished_gws:
-            count = self._sync_dream_team(gw.fpl_id)
+        for gw, dream_team_data in zip(finished_gws, payloads):
+            if isinstance(dream_team_data, Exception):
+                logger.warning(
+                    f"Failed to fetch dream team for GW {gw.fpl_id}: {dream_team_data}"
+                )
+                continue
+            count = self._sync_dream_team(dream_team_data, gw.id, player_map)
             total_count += count
 
         return total_count
 
-    def _sync_dream_team(self, gw_fpl_id: int) -> int:
-        """Sync dream team for a single gameweek."""
-        try:
-            dream_team_data = self.fpl_client.get_dream_team(gw_fpl_id)
-        except Exception as e:
-            logger.warning(f"Failed to fetch dream team for GW {gw_fpl_id}: {e}")
-            return 0
+    def _sync_dream_team(
+        self,
+        dream_team_data: dict[str, Any],
+        gameweek_id: int,
+        player_map: dict[int, int],
+    ) -> int:
+        """
+        Sync dream team for a single gameweek.
 
+        Args:
+            dream_team_data: The gameweek's dream team payload from the FPL API
+            gameweek_id: Database ID of the gameweek
+            player_map: Player FPL ID to database ID mapping
+        """
         team_list = dream_team_data.get("team", [])
         if not team_list:
             return 0
 
-        # Build mappings
-        players = self.db.query(Player).all()
-        player_map = {p.fpl_id: p.id for p in players}
-        gw = self.db.query(Gameweek).filter(Gameweek.fpl_id == gw_fpl_id).first()
-        if not gw:
-            return 0
-
-        count = 0
+        rows = []
         for idx, entry in enumerate(team_list, start=1):
             player_fpl_id = entry["element"]
             player_db_id = player_map.get(player_fpl_id)
             if not player_db_id:
                 continue
 
-            # Check if entry already exists
-            existing = (
-                self.db.query(DreamTeam)
-                .filter(
-                    DreamTeam.gameweek_id == gw.id,
-                    DreamTeam.player_id == player_db_id,
-                )
-                .first()
+            rows.append(
+                {
+                    "gameweek_id": gameweek_id,
+                    "player_id": player_db_id,
+                    "position_slot": idx,
+                    "points": entry.get("points", 0),
+                }
             )
 
-            if not existing:
-                existing = DreamTeam(gameweek_id=gw.id, player_id=player_db_id)
-                self.db.add(existing)
-
-            existing.position_slot = idx
-            existing.points = entry.get("points", 0)
-            count += 1
-
-        self.db.flush()
-        return count
+        upsert_rows(self.db, DreamTeam, rows, ["gameweek_id", "player_id"])
+        return len(rows)
 
-    def _sync_set_piece_takers(self) -> None:
+    def _sync_set_piece_takers(
+        self, set_piece_data: list[dict[str, Any]] | Exception
+    ) -> None:
         """Sync set piece taker information."""
-        try:
-            set_piece_data = self.fpl_client.get_set_piece_notes()
-        except Exception as e:
-            logger.warning(f"Failed to fetch set piece notes: {e}")
+        if isinstance(set_piece_data, Exception):
+            logger.warning(f"Failed to fetch set piece notes: {set_piece_data}")
             return
 
         # Reset all set piece flags first
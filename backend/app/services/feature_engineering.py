@@ -1,10 +1,11 @@
 """Feature engineering for player predictions."""
 
 import logging
-from typing import Any
+from bisect import bisect_left
 
 import numpy as np
 import pandas as pd
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from app.constants import (
@@ -17,12 +18,91 @@ from app.models import Fixture, Gameweek, Player, PlayerGWStats, Team
 
 logger = logging.getLogger(__name__)
 
+# Stand-ins for a missing team strength or fixture difficulty
+_DEFAULT_STRENGTH = 1000
+_DEFAULT_DIFFICULTY = 3
+
+# Stat columns summed / averaged over each rolling window
+_WINDOW_SUM_COLUMNS = [
+    "total_points",
+    "starts",
+    "goals_scored",
+    "assists",
+    "clean_sheets",
+    "bonus",
+    "xg",
+    "xa",
+    "shots",
+    "key_passes",
+]
+_WINDOW_MEAN_COLUMNS = ["total_points", "minutes", "bps"]
+
+# Identifier columns, kept at full width when feature dtypes are narrowed
+_ID_COLUMNS = ["player_id", "player_fpl_id", "team_id"]
+
+
+def _downcast_features(features: pd.DataFrame) -> pd.DataFrame:
+    """
+    Narrow feature dtypes: float64 to float32 and integers to int16.
+
+    The models train on float32 anyway, and the integer features (flags,
+    prices, strengths, windowed counts) are all far below the int16 range,
+    so this halves the frame's size without losing anything they use.
+    """
+    dtypes = {}
+    for column in features.columns.difference(_ID_COLUMNS):
+        if pd.api.types.is_float_dtype(features[column]):
+            dtypes[column] = "float32"
+        elif pd.api.types.is_integer_dtype(features[column]):
+            dtypes[column] = "int16"
+    return features.astype(dtypes)
+
+
+def _trailing_sum(
+    values: np.ndarray,
+    position: np.ndarray,
+    window: int,
+    center: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    Sum each row with up to window - 1 preceding rows of the same player.
+
+    Args:
+        values: 2D array, one row per appearance, sorted by player
+        position: Each row's index within its player's appearances
+        window: Window size
+        center: If given, sum squared deviations from these per-row values
+            instead of the values themselves
+
+    Returns:
+        2D float array of the same shape as values
+    """
+    def term(rows: np.ndarray, lag: int) -> np.ndarray:
+        if center is None:
+            return rows
+        return (rows - center[lag:][position[lag:] >= lag]) ** 2
+
+    totals = term(values, 0).copy()
+    for lag in range(1, window):
+        valid = position[lag:] >= lag
+        if not valid.any():
+            break
+        shifted = totals[lag:]
+        shifted[valid] += term(values[:-lag][valid], lag)
+    return totals
+
 
 class FeatureEngineer:
     """Generates features for ML models from player stats."""
 
     def __init__(self, db: Session):
         self.db = db
+        # (max_gw, stats_df, rolling_df) from the last _load_rolling_stats
+        self._stats_cache: tuple[int, pd.DataFrame, pd.DataFrame] | None = None
+
+    def invalidate(self) -> None:
+        """Drop cached stats so the next call reloads them from the database."""
+        self._stats_cache = None
 
     def get_player_features_for_gameweek(
         self, target_gw: int
@@ -36,224 +116,384 @@ class FeatureEngineer:
         Returns:
             DataFrame with one row per player and feature columns
         """
-        # Get all players
-        players = self.db.query(Player).all()
-        gameweeks = self.db.query(Gameweek).filter(Gameweek.fpl_id < target_gw).all()
-        gw_ids = [gw.id for gw in gameweeks]
+        gw_count = self.db.execute(
+            select(func.count(Gameweek.id)).where(Gameweek.fpl_id < target_gw)
+        ).scalar()
 
-        if len(gw_ids) < MIN_GAMEWEEKS_FOR_PREDICTION:
+        if gw_count < MIN_GAMEWEEKS_FOR_PREDICTION:
             logger.warning(
-                f"Not enough gameweeks ({len(gw_ids)}) for feature engineering"
+                f"Not enough gameweeks ({gw_count}) for feature engineering"
             )
             return pd.DataFrame()
 
-        # Get all player stats for historical gameweeks
-        stats = (
-            self.db.query(PlayerGWStats)
-            .filter(PlayerGWStats.gameweek_id.in_(gw_ids))
-            .all()
+        stats_df, rolling_df = self._load_rolling_stats(target_gw - 1)
+        if stats_df.empty:
+            return pd.DataFrame()
+
+        strengths = self._load_team_strengths()
+        fixtures = self._load_fixtures(target_gw, target_gw, len(strengths))
+
+        return self._assemble_features(
+            self._build_player_frame(),
+            self._latest_rolling_features(stats_df, rolling_df, target_gw),
+            fixtures[target_gw],
+            strengths,
         )
 
-        # Build player stats DataFrame
-        stats_data = []
-        for s in stats:
-            gw = next((g for g in gameweeks if g.id == s.gameweek_id), None)
-            if gw:
-                stats_data.append(
-                    {
-                        "player_id": s.player_id,
-                        "gw_fpl_id": gw.fpl_id,
-                        "minutes": s.minutes,
-                        "goals_scored": s.goals_scored,
-                        "assists": s.assists,
-                        "clean_sheets": s.clean_sheets,
-                        "goals_conceded": s.goals_conceded,
-                        "saves": s.saves,
-                        "bonus": s.bonus,
-                        "bps": s.bps,
-                        "total_points": s.total_points,
-                        "shots": s.shots or 0,
-                        "key_passes": s.key_passes or 0,
-                        "xg": float(s.xg) if s.xg else 0.0,
-                        "xa": float(s.xa) if s.xa else 0.0,
-                    }
-                )
+    def _load_rolling_stats(self, max_gw: int) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Player stats up to a gameweek and their rolling features, cached.
 
-        if not stats_data:
-            return pd.DataFrame()
+        Rolling windows only look back, so a cached load for a later
+        gameweek is sliced rather than re-queried. Training followed by
+        prediction for the next gameweek therefore loads stats once.
 
-        stats_df = pd.DataFrame(stats_data)
-        stats_df = stats_df.sort_values(["player_id", "gw_fpl_id"])
+        Args:
+            max_gw: Last gameweek (FPL ID) to include
 
-        # Get fixture info for target gameweek
-        target_gw_db = (
-            self.db.query(Gameweek).filter(Gameweek.fpl_id == target_gw).first()
+        Returns:
+            Tuple of (_load_stats output, matching _compute_rolling_features
+            output)
+        """
+        if self._stats_cache is None or self._stats_cache[0] < max_gw:
+            stats_df = self._load_stats(max_gw)
+            rolling_df = self._compute_rolling_features(stats_df)
+            self._stats_cache = (max_gw, stats_df, rolling_df)
+            return stats_df, rolling_df
+
+        cached_gw, stats_df, rolling_df = self._stats_cache
+        if cached_gw == max_gw or stats_df.empty:
+            return stats_df, rolling_df
+        keep = stats_df["gw_fpl_id"] <= max_gw
+        return stats_df[keep], rolling_df[keep]
+
+    def _load_stats(self, max_gw: int) -> pd.DataFrame:
+        """
+        Load player stats up to and including a gameweek.
+
+        Args:
+            max_gw: Last gameweek (FPL ID) to include
+
+        Returns:
+            One row per appearance, sorted by player then gameweek
+        """
+        # Plain rows, with each row's gameweek FPL ID joined in and missing
+        # values defaulted
+        result = self.db.execute(
+            select(
+                PlayerGWStats.player_id,
+                Gameweek.fpl_id.label("gw_fpl_id"),
+                PlayerGWStats.minutes,
+                PlayerGWStats.goals_scored,
+                PlayerGWStats.assists,
+                PlayerGWStats.clean_sheets,
+                PlayerGWStats.goals_conceded,
+                PlayerGWStats.saves,
+                PlayerGWStats.bonus,
+                PlayerGWStats.bps,
+                PlayerGWStats.total_points,
+                func.coalesce(PlayerGWStats.shots, 0).label("shots"),
+                func.coalesce(PlayerGWStats.key_passes, 0).label("key_passes"),
+                func.coalesce(PlayerGWStats.xg, 0.0).label("xg"),
+                func.coalesce(PlayerGWStats.xa, 0.0).label("xa"),
+            )
+            .join(Gameweek, Gameweek.id == PlayerGWStats.gameweek_id)
+            .where(Gameweek.fpl_id <= max_gw)
+            .order_by(PlayerGWStats.player_id, Gameweek.fpl_id)
         )
-        fixtures = []
-        if target_gw_db:
-            fixtures = (
-                self.db.query(Fixture)
-                .filter(Fixture.gameweek_id == target_gw_db.id)
-                .all()
+        return pd.DataFrame(result.all(), columns=list(result.keys()))
+
+    def _load_team_strengths(self) -> np.ndarray:
+        """
+        Team strengths as an array indexed by team ID.
+
+        Columns are attack_home, defence_home, attack_away, defence_away.
+        Team IDs start at 1, so row 0 (all defaults) stands in for players
+        without a team and for teams without an opponent.
+        """
+        teams = self.db.execute(
+            select(
+                Team.id,
+                Team.strength_attack_home,
+                Team.strength_defence_home,
+                Team.strength_attack_away,
+                Team.strength_defence_away,
             )
+        ).all()
 
-        # Build fixture mapping: team_id -> (opponent_id, is_home, difficulty)
-        fixture_map = {}
-        teams = self.db.query(Team).all()
-        team_db_to_fpl = {t.id: t.fpl_id for t in teams}
+        size = max((team.id for team in teams), default=0) + 1
+        strengths = np.full((size, 4), _DEFAULT_STRENGTH, dtype=np.int32)
+        for team_id, *values in teams:
+            strengths[team_id] = [_DEFAULT_STRENGTH if v is None else v for v in values]
+        return strengths
 
-        for fix in fixtures:
-            fixture_map[fix.team_home_id] = {
-                "opponent_id": fix.team_away_id,
-                "is_home": True,
-                "difficulty": fix.difficulty_home or 3,
-            }
-            fixture_map[fix.team_away_id] = {
-                "opponent_id": fix.team_home_id,
-                "is_home": False,
-                "difficulty": fix.difficulty_away or 3,
-            }
+    def _load_fixtures(
+        self, min_gw: int, max_gw: int, n_teams: int
+    ) -> dict[int, np.ndarray]:
+        """
+        Build each gameweek's fixture array in one query.
 
-        # Generate features per player
-        features = []
-        for player in players:
-            player_stats = stats_df[stats_df["player_id"] == player.id]
+        Args:
+            min_gw: First gameweek to load
+            max_gw: Last gameweek to load
+            n_teams: Rows per array, i.e. len(_load_team_strengths())
 
-            if len(player_stats) == 0:
-                # New player or no appearances
-                continue
+        Returns:
+            Gameweek FPL ID -> array indexed by team ID with columns
+            (opponent_id, is_home, difficulty), for every gameweek in
+            the range; teams without a fixture have opponent 0
+        """
+        fixtures = self.db.execute(
+            select(
+                Gameweek.fpl_id,
+                Fixture.team_home_id,
+                Fixture.team_away_id,
+                Fixture.difficulty_home,
+                Fixture.difficulty_away,
+            )
+            .join(Gameweek, Gameweek.id == Fixture.gameweek_id)
+            .where(Gameweek.fpl_id.between(min_gw, max_gw))
+            .order_by(Fixture.id)
+        )
 
-            feature_row = self._compute_player_features(
-                player, player_stats, fixture_map, teams
+        no_fixture = np.zeros((n_teams, 3), dtype=np.int32)
+        no_fixture[:, 2] = _DEFAULT_DIFFICULTY
+        fixture_arrays = {gw: no_fixture.copy() for gw in range(min_gw, max_gw + 1)}
+        for fix in fixtures:
+            fixture_arr = fixture_arrays[fix.fpl_id]
+            fixture_arr[fix.team_home_id] = (
+                fix.team_away_id,
+                1,
+                fix.difficulty_home or _DEFAULT_DIFFICULTY,
+            )
+            fixture_arr[fix.team_away_id] = (
+                fix.team_home_id,
+                0,
+                fix.difficulty_away or _DEFAULT_DIFFICULTY,
+            )
+        return fixture_arrays
+
+    def _build_player_frame(self) -> pd.DataFrame:
+        """Per-player metadata features for every player."""
+        # Only the columns features are built from, loaded straight into columns
+        result = self.db.execute(
+            select(
+                Player.id.label("player_id"),
+                Player.fpl_id.label("player_fpl_id"),
+                Player.position,
+                Player.team_id,
+                Player.is_penalty_taker,
+                Player.is_corner_taker,
+                Player.is_freekick_taker,
+                Player.now_cost,
+                Player.chance_of_playing,
             )
-            if feature_row:
-                features.append(feature_row)
+        )
+        players = pd.DataFrame(result.all(), columns=list(result.keys()))
 
-        return pd.DataFrame(features)
+        player_df = players[
+            ["player_id", "player_fpl_id", "position", "team_id"]
+        ].copy()
 
-    def _compute_player_features(
+        # Position encoding
+        for position, column in (
+            (Position.GKP, "is_gkp"),
+            (Position.DEF, "is_def"),
+            (Position.MID, "is_mid"),
+            (Position.FWD, "is_fwd"),
+        ):
+            player_df[column] = (player_df["position"] == position.value).astype(int)
+
+        # Set piece duties (NULL counts as no duty)
+        player_df["is_penalty_taker"] = players["is_penalty_taker"].eq(True).astype(int)
+        player_df["is_set_piece_taker"] = (
+            players["is_corner_taker"].eq(True) | players["is_freekick_taker"].eq(True)
+        ).astype(int)
+
+        # Current state (missing or zero values fall back to the defaults)
+        for column, default in (("now_cost", 50), ("chance_of_playing", 100)):
+            values = players[column].fillna(0).astype(int)
+            player_df[column] = values.mask(values == 0, default)
+
+        return player_df
+
+    def _assemble_features(
         self,
-        player: Player,
-        stats_df: pd.DataFrame,
-        fixture_map: dict[int, dict[str, Any]],
-        teams: list[Team],
-    ) -> dict[str, Any] | None:
-        """Compute features for a single player."""
-        if len(stats_df) == 0:
-            return None
-
-        # Get team info
-        team = next((t for t in teams if t.id == player.team_id), None)
-        fixture_info = fixture_map.get(player.team_id, {})
-
-        features: dict[str, Any] = {
-            "player_id": player.id,
-            "player_fpl_id": player.fpl_id,
-            "position": player.position,
-            "team_id": player.team_id,
-        }
+        player_df: pd.DataFrame,
+        rolling_df: pd.DataFrame,
+        fixtures: np.ndarray,
+        strengths: np.ndarray,
+    ) -> pd.DataFrame:
+        """
+        Combine player, rolling and fixture features for one gameweek.
 
-        # Position encoding
-        features["is_gkp"] = 1 if player.position == Position.GKP.value else 0
-        features["is_def"] = 1 if player.position == Position.DEF.value else 0
-        features["is_mid"] = 1 if player.position == Position.MID.value else 0
-        features["is_fwd"] = 1 if player.position == Position.FWD.value else 0
-
-        # Set piece duties
-        features["is_penalty_taker"] = 1 if player.is_penalty_taker else 0
-        features["is_set_piece_taker"] = (
-            1 if (player.is_corner_taker or player.is_freekick_taker) else 0
+        Args:
+            player_df: Player metadata from _build_player_frame
+            rolling_df: Rolling features indexed by player_id; players
+                without a row (no appearances yet) are left out
+            fixtures: The gameweek's array from _load_fixtures
+            strengths: Team strengths from _load_team_strengths
+
+        Returns:
+            DataFrame with one row per player and feature columns
+        """
+        player_df = player_df[player_df["player_id"].isin(rolling_df.index)]
+        if player_df.empty:
+            return pd.DataFrame()
+
+        features = player_df.reset_index(drop=True).join(rolling_df, on="player_id")
+
+        # Fixture and strength context; players without a team use row 0
+        context_df = self._compute_team_context(
+            features["team_id"].fillna(0).to_numpy(dtype=np.intp),
+            fixtures,
+            strengths,
         )
+        context_df.index = features.index
+
+        games_played = features.pop("games_played")
+        features = pd.concat([features, context_df], axis=1)
+        features["games_played"] = games_played
+
+        return _downcast_features(features)
+
+    def _compute_rolling_features(self, stats_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Compute rolling-window features ending at every appearance.
 
-        # Current state
-        features["now_cost"] = player.now_cost or 50
-        features["chance_of_playing"] = player.chance_of_playing or 100
+        Row i holds what a prediction made right after that appearance
+        uses: aggregates over the player's last `window` appearances up to
+        and including it.
+
+        Args:
+            stats_df: Player stats sorted by player then gameweek
+
+        Returns:
+            DataFrame aligned with stats_df's index, one column per feature
+        """
+        stats_df = stats_df.assign(
+            starts=(stats_df["minutes"] >= 60).astype(np.int64)
+        )
+        # Rows are sorted by player, so each row's window is itself plus up
+        # to window - 1 preceding rows of the same player
+        position = stats_df.groupby("player_id", sort=False).cumcount().to_numpy()
+        sum_values = stats_df[_WINDOW_SUM_COLUMNS].to_numpy(dtype=np.float64)
+        mean_values = stats_df[_WINDOW_MEAN_COLUMNS].to_numpy(dtype=np.float64)
+        columns: dict[str, pd.Series] = {}
 
-        # Rolling stats for different windows
         for window in ROLLING_WINDOWS:
-            recent_stats = stats_df.tail(window)
+            counts = np.minimum(position + 1, window)[:, None]
+            sums = pd.DataFrame(
+                _trailing_sum(sum_values, position, window),
+                columns=_WINDOW_SUM_COLUMNS,
+                index=stats_df.index,
+            )
+            # Keep integer stats integer
+            for column in _WINDOW_SUM_COLUMNS:
+                if pd.api.types.is_integer_dtype(stats_df[column]):
+                    sums[column] = sums[column].astype(stats_df[column].dtype)
+
+            mean_arr = _trailing_sum(mean_values, position, window) / counts
+            means = pd.DataFrame(
+                mean_arr, columns=_WINDOW_MEAN_COLUMNS, index=stats_df.index
+            )
+
+            # Sample std (ddof=1), undefined for a single appearance
+            squares = _trailing_sum(mean_values, position, window, center=mean_arr)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                std_arr = np.sqrt(squares / (counts - 1))
+            std_arr[counts[:, 0] == 1] = np.nan
+            stds = pd.DataFrame(
+                std_arr, columns=_WINDOW_MEAN_COLUMNS, index=stats_df.index
+            )
 
             # Basic rolling stats
-            features[f"points_mean_{window}"] = recent_stats["total_points"].mean()
-            features[f"points_sum_{window}"] = recent_stats["total_points"].sum()
-            features[f"points_std_{window}"] = recent_stats["total_points"].std() or 0
+            columns[f"points_mean_{window}"] = means["total_points"]
+            columns[f"points_sum_{window}"] = sums["total_points"]
+            columns[f"points_std_{window}"] = stds["total_points"]
 
-            features[f"minutes_mean_{window}"] = recent_stats["minutes"].mean()
-            features[f"starts_{window}"] = (recent_stats["minutes"] >= 60).sum()
+            columns[f"minutes_mean_{window}"] = means["minutes"]
+            columns[f"starts_{window}"] = sums["starts"]
 
-            features[f"goals_sum_{window}"] = recent_stats["goals_scored"].sum()
-            features[f"assists_sum_{window}"] = recent_stats["assists"].sum()
-            features[f"ga_sum_{window}"] = (
-                recent_stats["goals_scored"].sum() + recent_stats["assists"].sum()
-            )
+            columns[f"goals_sum_{window}"] = sums["goals_scored"]
+            columns[f"assists_sum_{window}"] = sums["assists"]
+            columns[f"ga_sum_{window}"] = sums["goals_scored"] + sums["assists"]
 
-            features[f"cs_sum_{window}"] = recent_stats["clean_sheets"].sum()
-            features[f"bonus_sum_{window}"] = recent_stats["bonus"].sum()
-            features[f"bps_mean_{window}"] = recent_stats["bps"].mean()
+            columns[f"cs_sum_{window}"] = sums["clean_sheets"]
+            columns[f"bonus_sum_{window}"] = sums["bonus"]
+            columns[f"bps_mean_{window}"] = means["bps"]
 
             # xG/xA if available
-            features[f"xg_sum_{window}"] = recent_stats["xg"].sum()
-            features[f"xa_sum_{window}"] = recent_stats["xa"].sum()
-            features[f"xga_sum_{window}"] = (
-                recent_stats["xg"].sum() + recent_stats["xa"].sum()
-            )
+            columns[f"xg_sum_{window}"] = sums["xg"]
+            columns[f"xa_sum_{window}"] = sums["xa"]
+            columns[f"xga_sum_{window}"] = sums["xg"] + sums["xa"]
 
             # Goal-xG overperformance
-            goals = recent_stats["goals_scored"].sum()
-            xg = recent_stats["xg"].sum()
-            features[f"goal_overperformance_{window}"] = goals - xg if xg > 0 else 0
+            columns[f"goal_overperformance_{window}"] = (
+                sums["goals_scored"] - sums["xg"]
+            ).where(sums["xg"] > 0, 0)
 
             # Involvement (shots + key passes)
-            features[f"involvement_{window}"] = (
-                recent_stats["shots"].sum() + recent_stats["key_passes"].sum()
-            )
-
-        # Fixture context
-        features["is_home"] = 1 if fixture_info.get("is_home", False) else 0
-        features["fixture_difficulty"] = fixture_info.get("difficulty", 3)
-
-        # Opponent strength
-        opponent_id = fixture_info.get("opponent_id")
-        if opponent_id:
-            opponent = next((t for t in teams if t.id == opponent_id), None)
-            if opponent:
-                if features["is_home"]:
-                    features["opponent_attack_strength"] = (
-                        opponent.strength_attack_away or 1000
-                    )
-                    features["opponent_defence_strength"] = (
-                        opponent.strength_defence_away or 1000
-                    )
-                else:
-                    features["opponent_attack_strength"] = (
-                        opponent.strength_attack_home or 1000
-                    )
-                    features["opponent_defence_strength"] = (
-                        opponent.strength_defence_home or 1000
-                    )
-            else:
-                features["opponent_attack_strength"] = 1000
-                features["opponent_defence_strength"] = 1000
-        else:
-            features["opponent_attack_strength"] = 1000
-            features["opponent_defence_strength"] = 1000
-
-        # Team strength
-        if team:
-            if features["is_home"]:
-                features["team_attack_strength"] = team.strength_attack_home or 1000
-                features["team_defence_strength"] = team.strength_defence_home or 1000
-            else:
-                features["team_attack_strength"] = team.strength_attack_away or 1000
-                features["team_defence_strength"] = team.strength_defence_away or 1000
-        else:
-            features["team_attack_strength"] = 1000
-            features["team_defence_strength"] = 1000
+            columns[f"involvement_{window}"] = sums["shots"] + sums["key_passes"]
 
         # Games played (for filtering)
-        features["games_played"] = len(stats_df)
+        columns["games_played"] = pd.Series(position + 1, index=stats_df.index)
+
+        return pd.DataFrame(columns, index=stats_df.index)
 
-        return features
+    def _latest_rolling_features(
+        self, stats_df: pd.DataFrame, rolling_df: pd.DataFrame, target_gw: int
+    ) -> pd.DataFrame:
+        """
+        Each player's rolling features as of just before a gameweek.
+
+        Args:
+            stats_df: Player stats sorted by player then gameweek
+            rolling_df: Output of _compute_rolling_features for stats_df
+            target_gw: Gameweek being predicted (only earlier data is used)
+
+        Returns:
+            Rolling features indexed by player_id
+        """
+        before = stats_df["gw_fpl_id"] < target_gw
+        player_ids = stats_df.loc[before, "player_id"]
+        latest = ~player_ids.duplicated(keep="last")
+        return rolling_df.loc[latest[latest].index].set_index(
+            player_ids[latest].rename(None)
+        )
+
+    def _compute_team_context(
+        self,
+        team_ids: np.ndarray,
+        fixtures: np.ndarray,
+        strengths: np.ndarray,
+    ) -> pd.DataFrame:
+        """
+        Fixture and strength features for each player's team.
+
+        Gathers from the fixture and strength arrays by team ID, picking the
+        home or away strength column for the team and its opponent.
+        """
+        fixture = fixtures[team_ids]
+        is_home = fixture[:, 1] == 1
+        team = strengths[team_ids]
+        opponent = strengths[fixture[:, 0]]
+
+        return pd.DataFrame(
+            {
+                "is_home": fixture[:, 1],
+                "fixture_difficulty": fixture[:, 2],
+                # Opponent plays away when we are at home, and vice versa
+                "opponent_attack_strength": np.where(
+                    is_home, opponent[:, 2], opponent[:, 0]
+                ),
+                "opponent_defence_strength": np.where(
+                    is_home, opponent[:, 3], opponent[:, 1]
+                ),
+                "team_attack_strength": np.where(is_home, team[:, 0], team[:, 2]),
+                "team_defence_strength": np.where(is_home, team[:, 1], team[:, 3]),
+            }
+        )
 
     def get_training_data(
         self, min_gw: int, max_gw: int
@@ -261,6 +501,10 @@ class FeatureEngineer:
         """
         Get features and targets for training.
 
+        Stats, players, teams and fixtures are loaded once for the whole
+        range, and rolling windows are computed in a single pass; each
+        gameweek then takes every player's latest window before it.
+
         Args:
             min_gw: Minimum gameweek to include
             max_gw: Maximum gameweek to include
@@ -268,30 +512,46 @@ class FeatureEngineer:
         Returns:
             Tuple of (features DataFrame, target Series)
         """
+        gw_fpl_ids = sorted(
+            self.db.execute(select(Gameweek.fpl_id)).scalars().all()
+        )
+        known_gws = set(gw_fpl_ids)
+
+        stats_df, rolling_df = self._load_rolling_stats(max_gw)
+        player_df = self._build_player_frame()
+        strengths = self._load_team_strengths()
+        fixtures = self._load_fixtures(min_gw, max_gw, len(strengths))
+
         all_features = []
         all_targets = []
 
         for gw in range(min_gw, max_gw + 1):
-            # Get features using data before this GW
-            features_df = self.get_player_features_for_gameweek(gw)
-            if features_df.empty:
+            # Features use data before this GW only
+            gw_count = bisect_left(gw_fpl_ids, gw)
+            if gw_count < MIN_GAMEWEEKS_FOR_PREDICTION:
+                logger.warning(
+                    f"Not enough gameweeks ({gw_count}) for feature engineering"
+                )
                 continue
 
-            # Get actual points for this GW
-            gw_db = self.db.query(Gameweek).filter(Gameweek.fpl_id == gw).first()
-            if not gw_db:
+            features_df = self._assemble_features(
+                player_df,
+                self._latest_rolling_features(stats_df, rolling_df, gw),
+                fixtures[gw],
+                strengths,
+            )
+            if features_df.empty or gw not in known_gws:
                 continue
 
-            stats = (
-                self.db.query(PlayerGWStats)
-                .filter(PlayerGWStats.gameweek_id == gw_db.id)
-                .all()
+            # Get actual points for this GW
+            gw_stats = stats_df[stats_df["gw_fpl_id"] == gw]
+            actual_points = pd.Series(
+                gw_stats["total_points"].to_numpy(), index=gw_stats["player_id"]
             )
-            actual_points = {s.player_id: s.total_points for s in stats}
 
-            # Add target column
-            features_df["target_points"] = features_df["player_id"].map(
-                lambda x: actual_points.get(x, 0)
+            # Add target column (players who did not play scored 0)
+            features_df["target_points"] = (
+                features_df["player_id"].map(actual_points).fillna(0).astype("int16")
             )
             features_df["target_gw"] = gw
 
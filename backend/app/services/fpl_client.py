@@ -1,26 +1,94 @@
 """FPL API client for fetching data from Fantasy Premier League."""
 
+import asyncio
+import hashlib
 import logging
+import os
+import tempfile
 import time
 from datetime import datetime
+from pathlib import Path
 from typing import Any
 
 import httpx
+import orjson
 
 from app.config import get_settings
-from app.constants import FPL_API_RATE_LIMIT_SECONDS, Position
+from app.constants import (
+    CACHE_TTL_BOOTSTRAP,
+    CACHE_TTL_FOREVER,
+    CACHE_TTL_LIVE,
+    FPL_API_MAX_CONCURRENCY,
+    FPL_API_RATE_LIMIT_SECONDS,
+    Position,
+)
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
+class ResponseCache:
+    """
+    On-disk cache of raw FPL API response bodies, keyed by URL.
+
+    Each entry records its expiry time when written, so a later read with a
+    different TTL (e.g. a gameweek that has since finished) cannot revive a
+    short-lived entry. A TTL of None never expires and a TTL of 0 bypasses
+    the cache. Hits skip both the request and the rate-limit wait.
+    """
+
+    def __init__(self, cache_dir: str | None = None):
+        cache_dir = settings.fpl_cache_dir if cache_dir is None else cache_dir
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+
+    def _path(self, url: str) -> Path:
+        key = hashlib.blake2b(url.encode(), digest_size=16).hexdigest()
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, url: str) -> Any | None:
+        """Return the cached payload for url, or None if missing or expired."""
+        if self.cache_dir is None:
+            return None
+        try:
+            # First line is the expiry timestamp ("-" for never)
+            header, _, body = self._path(url).read_bytes().partition(b"\n")
+            if header != b"-" and time.time() > float(header):
+                return None
+            return orjson.loads(body)
+        except (OSError, ValueError, orjson.JSONDecodeError):
+            return None
+
+    def put(self, url: str, ttl: float | None, content: bytes) -> None:
+        """Store a response body, replacing any previous entry atomically."""
+        if self.cache_dir is None or ttl == 0:
+            return
+        header = b"-" if ttl is None else repr(time.time() + ttl).encode()
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(header + b"\n")
+                f.write(content)
+            os.replace(tmp_path, self._path(url))
+        except OSError as e:
+            logger.warning(f"Could not cache {url}: {e}")
+
+
+def _gameweek_ttl(finished: bool) -> float | None:
+    """Cache TTL for a per-gameweek endpoint."""
+    return CACHE_TTL_FOREVER if finished else CACHE_TTL_LIVE
+
+
 class FPLClient:
     """Client for interacting with the FPL API."""
 
     BASE_URL = "https://fantasy.premierleague.com/api"
 
-    def __init__(self):
+    def __init__(self, cache: ResponseCache | None = None):
         self.client = httpx.Client(timeout=30.0)
+        self.cache = cache or ResponseCache()
+        # time.monotonic() before which the next request must not be sent
+        self._next_allowed = 0.0
 
     def close(self):
         """Close the HTTP client."""
@@ -32,17 +100,37 @@ class FPLClient:
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
 
-    def _get(self, endpoint: str) -> dict[str, Any]:
-        """Make a GET request to the FPL API with rate limiting."""
+    def _get(self, endpoint: str, ttl: float | None = 0) -> dict[str, Any]:
+        """
+        Make a GET request to the FPL API with rate limiting.
+
+        Args:
+            endpoint: Path below BASE_URL
+            ttl: Seconds the response is cached for (None: forever,
+                0: not cached)
+        """
         url = f"{self.BASE_URL}{endpoint}"
+        cached = None if ttl == 0 else self.cache.get(url)
+        if cached is not None:
+            logger.info(f"Using cached {url}")
+            return cached
+
         logger.info(f"Fetching {url}")
 
-        # Rate limiting to be respectful to FPL servers
-        time.sleep(FPL_API_RATE_LIMIT_SECONDS)
+        # Rate limiting to be respectful to FPL servers: only wait for
+        # whatever is left of the gap since the previous request
+        delay = self._next_allowed - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
 
-        response = self.client.get(url)
+        try:
+            response = self.client.get(url)
+        finally:
+            self._next_allowed = time.monotonic() + FPL_API_RATE_LIMIT_SECONDS
         response.raise_for_status()
-        return response.json()
+        self.cache.put(url, ttl, response.content)
+        # Parse the raw bytes with orjson rather than the stdlib via .json()
+        return orjson.loads(response.content)
 
     def get_bootstrap_static(self) -> dict[str, Any]:
         """
@@ -52,7 +140,7 @@ class FPLClient:
         - events: All gameweeks
         - element_types: Position types (GKP, DEF, MID, FWD)
         """
-        return self._get("/bootstrap-static/")
+        return self._get("/bootstrap-static/", ttl=CACHE_TTL_BOOTSTRAP)
 
     def get_fixtures(self, gameweek: int | None = None) -> list[dict[str, Any]]:
         """
@@ -62,18 +150,25 @@ class FPLClient:
             gameweek: Optional gameweek filter. If None, returns all fixtures.
         """
         if gameweek:
-            return self._get(f"/fixtures/?event={gameweek}")
-        return self._get("/fixtures/")
+            return self._get(f"/fixtures/?event={gameweek}", ttl=CACHE_TTL_BOOTSTRAP)
+        return self._get("/fixtures/", ttl=CACHE_TTL_BOOTSTRAP)
 
-    def get_gameweek_live(self, gameweek: int) -> dict[str, Any]:
+    def get_gameweek_live(
+        self, gameweek: int, finished: bool = False
+    ) -> dict[str, Any]:
         """
         Get live data for a gameweek.
 
         Returns player stats for the gameweek including:
         - minutes, goals, assists, clean_sheets, etc.
         - bonus, bps (bonus points system)
+
+        Args:
+            gameweek: Gameweek FPL ID
+            finished: Whether the gameweek is finished (its data is then
+                cached indefinitely)
         """
-        return self._get(f"/event/{gameweek}/live/")
+        return self._get(f"/event/{gameweek}/live/", ttl=_gameweek_ttl(finished))
 
     def get_player_summary(self, player_id: int) -> dict[str, Any]:
         """
@@ -86,15 +181,20 @@ class FPLClient:
         """
         return self._get(f"/element-summary/{player_id}/")
 
-    def get_dream_team(self, gameweek: int) -> dict[str, Any]:
+    def get_dream_team(self, gameweek: int, finished: bool = False) -> dict[str, Any]:
         """
         Get the Dream Team (Team of the Week) for a gameweek.
 
         Returns:
         - team: List of 11 players with highest points
         - top_player: Player of the week
+
+        Args:
+            gameweek: Gameweek FPL ID
+            finished: Whether the gameweek is finished (its data is then
+                cached indefinitely)
         """
-        return self._get(f"/dream-team/{gameweek}/")
+        return self._get(f"/dream-team/{gameweek}/", ttl=_gameweek_ttl(finished))
 
     def get_set_piece_notes(self) -> list[dict[str, Any]]:
         """
@@ -102,7 +202,7 @@ class FPLClient:
 
         Returns info about penalty, corner, and free kick takers.
         """
-        return self._get("/team/set-piece-notes/")
+        return self._get("/team/set-piece-notes/", ttl=CACHE_TTL_BOOTSTRAP)
 
     def get_event_status(self) -> dict[str, Any]:
         """
@@ -113,6 +213,94 @@ class FPLClient:
         return self._get("/event-status/")
 
 
+class AsyncFPLClient:
+    """
+    Async client for fetching many FPL endpoints concurrently.
+
+    At most max_concurrency requests are in flight at once, and each
+    in-flight slot waits out the rate limit between its requests.
+    """
+
+    BASE_URL = FPLClient.BASE_URL
+
+    def __init__(
+        self,
+        max_concurrency: int = FPL_API_MAX_CONCURRENCY,
+        cache: ResponseCache | None = None,
+    ):
+        self.client = httpx.AsyncClient(timeout=30.0)
+        self.cache = cache or ResponseCache()
+        # One token per in-flight slot, holding the time.monotonic() before
+        # which that slot may not send its next request
+        self._slots: asyncio.Queue[float] = asyncio.Queue()
+        for _ in range(max_concurrency):
+            self._slots.put_nowait(0.0)
+
+    async def close(self):
+        """Close the HTTP client."""
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def _get(
+        self, endpoint: str, ttl: float | None = 0, refresh: bool = False
+    ) -> dict[str, Any]:
+        """
+        Make a GET request to the FPL API with rate limiting (see FPLClient._get).
+
+        With refresh, any cached response is ignored and replaced by the new one.
+        """
+        url = f"{self.BASE_URL}{endpoint}"
+        cached = None if ttl == 0 or refresh else self.cache.get(url)
+        if cached is not None:
+            logger.info(f"Using cached {url}")
+            return cached
+
+        next_allowed = await self._slots.get()
+        try:
+            logger.info(f"Fetching {url}")
+
+            # Rate limiting to be respectful to FPL servers
+            delay = next_allowed - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            response = await self.client.get(url)
+        finally:
+            self._slots.put_nowait(time.monotonic() + FPL_API_RATE_LIMIT_SECONDS)
+        response.raise_for_status()
+        self.cache.put(url, ttl, response.content)
+        return orjson.loads(response.content)
+
+    async def get_fixtures(self) -> list[dict[str, Any]]:
+        """Get all fixtures."""
+        return await self._get("/fixtures/", ttl=CACHE_TTL_BOOTSTRAP)
+
+    async def get_set_piece_notes(self) -> list[dict[str, Any]]:
+        """Get set piece taker notes for all teams."""
+        return await self._get("/team/set-piece-notes/", ttl=CACHE_TTL_BOOTSTRAP)
+
+    async def get_gameweek_live(
+        self, gameweek: int, finished: bool = False, refresh: bool = False
+    ) -> dict[str, Any]:
+        """Get live data (player stats) for a gameweek."""
+        return await self._get(
+            f"/event/{gameweek}/live/", ttl=_gameweek_ttl(finished), refresh=refresh
+        )
+
+    async def get_dream_team(
+        self, gameweek: int, finished: bool = False, refresh: bool = False
+    ) -> dict[str, Any]:
+        """Get the Dream Team (Team of the Week) for a gameweek."""
+        return await self._get(
+            f"/dream-team/{gameweek}/", ttl=_gameweek_ttl(finished), refresh=refresh
+        )
+
+
 def parse_fpl_datetime(dt_str: str | None) -> datetime | None:
     """Parse FPL datetime string to Python datetime."""
     if not dt_str:
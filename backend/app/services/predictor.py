@@ -1,17 +1,47 @@
 """Prediction service for generating Dream Team predictions."""
 
+import hashlib
+import inspect
+import json
 import logging
-from typing import Literal
-
-from sqlalchemy.orm import Session
+import os
+import pickle
+import tempfile
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Literal, TypeVar, get_args
+
+import numpy as np
+import pandas as pd
+from lightgbm.basic import LightGBMError
+from sqlalchemy import func, insert, or_, select
+from sqlalchemy.orm import Session, aliased
 
 from app.config import get_settings
-from app.constants import MIN_GAMEWEEKS_FOR_PREDICTION
-from app.ml.formation_solver import PlayerPrediction, solve_formation
+from app.constants import (
+    DEFAULT_MODEL_PARAMS,
+    MIN_GAMEWEEKS_FOR_PREDICTION,
+    MODEL_CACHE_MAX_ENTRIES,
+    ROLLING_WINDOWS,
+)
+from app.ml.formation_solver import PlayerPrediction, solve_formation_vec
 from app.ml.points_model import PointsPredictor
 from app.ml.simple_model import SimpleFormPredictor
-from app.models import Gameweek, Player, Prediction, PredictionPlayer
-from app.services.feature_engineering import FeatureEngineer
+from app.models import (
+    Gameweek,
+    Player,
+    PlayerGWStats,
+    Prediction,
+    PredictionPlayer,
+    SyncRun,
+)
+from app.services.feature_engineering import (
+    _WINDOW_MEAN_COLUMNS,
+    _WINDOW_SUM_COLUMNS,
+    FeatureEngineer,
+)
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -19,12 +49,199 @@ settings = get_settings()
 # Available model types
 ModelType = Literal["lgbm", "simple", "ensemble"]
 
+# Stored Prediction.model_version for each model type
+MODEL_VERSIONS: dict[str, str] = {
+    model_type: f"{settings.model_version}-{model_type}"
+    for model_type in get_args(ModelType)
+}
+
+# Player statuses excluded from predictions
+UNAVAILABLE_STATUSES = ("u", "i", "s", "n")
+
+T = TypeVar("T")
+
+# Digest of the feature engineering code and every setting that shapes its
+# frames (including the shared constants the frontend also edits), so cached
+# features built by older code or settings are not reused
+_FEATURE_CODE_DIGEST = hashlib.sha1(
+    Path(inspect.getsourcefile(FeatureEngineer)).read_bytes()
+    + json.dumps(
+        {
+            "rolling_windows": ROLLING_WINDOWS,
+            "min_gameweeks_for_prediction": MIN_GAMEWEEKS_FOR_PREDICTION,
+            "window_sum_columns": _WINDOW_SUM_COLUMNS,
+            "window_mean_columns": _WINDOW_MEAN_COLUMNS,
+        },
+        sort_keys=True,
+    ).encode()
+).hexdigest()
+
+
+@dataclass
+class GeneratedPrediction:
+    """A newly stored prediction and the player IDs of its XI."""
+
+    prediction: Prediction
+    player_ids: list[int]
+
+
+def _data_version(db: Session) -> str | None:
+    """
+    Version of everything feature frames are built from, or None to not cache.
+
+    Synced data only changes through sync runs, so the latest finished run
+    versions it. The run's finish time and the gameweek/stats table contents
+    tell a recreated database (whose run IDs restart) apart, and the model
+    version and _FEATURE_CODE_DIGEST invalidate frames built by older code
+    or with other rolling windows.
+    Nothing is cached while a later sync is in progress, as its sources
+    commit separately and the data may be half updated.
+    """
+    latest_id = (
+        select(func.max(SyncRun.id))
+        .where(SyncRun.finished_at.is_not(None))
+        .scalar_subquery()
+    )
+    # Aliased so the latest_id subquery is not correlated to the outer query
+    run = aliased(SyncRun)
+    row = db.execute(
+        select(
+            latest_id,
+            select(run.finished_at).where(run.id == latest_id).scalar_subquery(),
+            select(func.count(run.id))
+            .where(run.finished_at.is_(None), run.id > latest_id)
+            .scalar_subquery(),
+            select(func.max(Gameweek.updated_at)).scalar_subquery(),
+            select(func.count(PlayerGWStats.id)).scalar_subquery(),
+        )
+    ).one()
+    run_id, finished_at, in_progress, gameweeks_updated, stats_count = row
+    if run_id is None or in_progress:
+        return None
+
+    digest = hashlib.sha1()
+    for part in (
+        settings.model_version,
+        _FEATURE_CODE_DIGEST,
+        run_id,
+        finished_at,
+        gameweeks_updated,
+        stats_count,
+    ):
+        digest.update(f"{part}\0".encode())
+    return digest.hexdigest()[:16]
+
+
+def _cached_frames(version: str | None, name: str, build: Callable[[], T]) -> T:
+    """
+    Load feature frames from settings.feature_cache_dir, or build and store them.
+
+    Entries are pickles named after the data version; storing one deletes
+    those of older versions.
+
+    Args:
+        version: Result of _data_version; None skips the cache
+        name: Entry name, unique per set of build arguments
+        build: Computes the frames on a cache miss
+    """
+    if version is None or not settings.feature_cache_dir:
+        return build()
+
+    cache_dir = Path(settings.feature_cache_dir)
+    suffix = f"_v{version}.pkl"
+    path = cache_dir / f"{name}{suffix}"
+    if path.exists():
+        try:
+            return pd.read_pickle(path)
+        except (OSError, EOFError, pickle.UnpicklingError) as e:
+            logger.warning(f"Ignoring unreadable cached features {path}: {e}")
+
+    frames = build()
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file and rename, so readers never see a partial pickle
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(frames, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        for stale in cache_dir.glob("*.pkl"):
+            if not stale.name.endswith(suffix):
+                stale.unlink(missing_ok=True)
+    except OSError as e:
+        logger.warning(f"Failed to cache features {path}: {e}")
+    return frames
+
+
+def _training_key(X_train: pd.DataFrame, y_train: pd.Series) -> str:
+    """Digest of the training set, model version and LightGBM params."""
+    digest = hashlib.sha1()
+    digest.update(settings.model_version.encode())
+    digest.update(json.dumps(DEFAULT_MODEL_PARAMS["lightgbm"], sort_keys=True).encode())
+    digest.update("\0".join(map(str, X_train.columns)).encode())
+    # hash_pandas_object hashes values, so object columns hash by content
+    digest.update(pd.util.hash_pandas_object(X_train).to_numpy().tobytes())
+    digest.update(pd.util.hash_pandas_object(y_train).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _prune_model_cache(cache_dir: Path) -> None:
+    """Delete all but the MODEL_CACHE_MAX_ENTRIES most recently used models."""
+    models = sorted(
+        cache_dir.glob("lgbm_*.txt"), key=lambda p: p.stat().st_mtime, reverse=True
+    )
+    for path in models[MODEL_CACHE_MAX_ENTRIES:]:
+        for suffix in (".txt", ".json", ".metrics.json"):
+            path.with_suffix(suffix).unlink(missing_ok=True)
+
+
+def _train_or_load(
+    X_train: pd.DataFrame, y_train: pd.Series, target_gw: int
+) -> tuple[PointsPredictor, dict[str, Any]]:
+    """
+    Train LightGBM on a training set, or load the model trained on it before.
+
+    Training data for a gameweek only changes when its stats do, so repeat
+    predictions (e.g. "lgbm" then "ensemble") reuse the cached model from
+    settings.model_cache_dir.
+
+    Returns:
+        Tuple of (fitted model, training metrics)
+    """
+    model = PointsPredictor()
+    if not settings.model_cache_dir:
+        return model, model.train(X_train, y_train)
+
+    cache_dir = Path(settings.model_cache_dir)
+    path = cache_dir / f"lgbm_{target_gw}_{_training_key(X_train, y_train)}.txt"
+    metrics_path = path.with_suffix(".metrics.json")
+    if path.exists() and metrics_path.exists():
+        try:
+            model.load(path)
+            with open(metrics_path) as f:
+                metrics = json.load(f)
+            path.touch()  # Mark as recently used
+            logger.info(f"Loaded cached LightGBM model for GW {target_gw}")
+            return model, metrics
+        except (OSError, ValueError, KeyError, LightGBMError) as e:
+            logger.warning(f"Ignoring unreadable cached model {path}: {e}")
+            model = PointsPredictor()
+
+    metrics = model.train(X_train, y_train)
+    try:
+        model.save(path)
+        with open(metrics_path, "w") as f:
+            json.dump(metrics, f, default=float)  # numpy scalars in top_features
+        _prune_model_cache(cache_dir)
+    except OSError as e:
+        logger.warning(f"Failed to cache LightGBM model: {e}")
+    return model, metrics
+
 
 def generate_prediction(
     db: Session,
     target_gw: int,
     model_type: ModelType = "ensemble",
-) -> Prediction | None:
+) -> GeneratedPrediction | None:
     """
     Generate a Dream Team prediction for a gameweek.
 
@@ -37,15 +254,20 @@ def generate_prediction(
             - "ensemble": Average of both (default, most robust)
 
     Returns:
-        Prediction model instance, or None if not enough data
+        The stored prediction with its XI's player IDs (known without
+        reloading its players), or None if not enough data
     """
-    # Check if we have enough historical data
-    finished_gws = (
-        db.query(Gameweek)
-        .filter(Gameweek.fpl_id < target_gw, Gameweek.finished == True)  # noqa: E712
-        .count()
-    )
+    # Finished gameweeks before the target and the target's ID, in one round trip
+    finished_gws, target_gw_id = db.execute(
+        select(
+            select(func.count(Gameweek.id))
+            .where(Gameweek.fpl_id < target_gw, Gameweek.finished == True)  # noqa: E712
+            .scalar_subquery(),
+            select(Gameweek.id).where(Gameweek.fpl_id == target_gw).scalar_subquery(),
+        )
+    ).one()
 
+    # Check if we have enough historical data
     if finished_gws < MIN_GAMEWEEKS_FOR_PREDICTION:
         logger.warning(
             f"Not enough historical data. Have {finished_gws} GWs, "
@@ -53,9 +275,8 @@ def generate_prediction(
         )
         return None
 
-    # Get target gameweek
-    target_gw_db = db.query(Gameweek).filter(Gameweek.fpl_id == target_gw).first()
-    if not target_gw_db:
+    # Check the target gameweek exists
+    if target_gw_id is None:
         logger.error(f"Gameweek {target_gw} not found")
         return None
 
@@ -72,22 +293,56 @@ def generate_prediction(
         logger.error(f"Cannot predict GW {target_gw}: no historical data available")
         return None
 
-    X_train, y_train = feature_engineer.get_training_data(start_gw, end_gw)
-    if X_train.empty:
-        logger.error("No training data available")
-        return None
+    # Features only change when a sync runs, so reuse them from disk until then
+    data_version = _data_version(db)
+
+    # The simple model needs no training, so skip loading training data
+    if model_type != "simple":
+        X_train, y_train = _cached_frames(
+            data_version,
+            f"training_{start_gw}_{end_gw}",
+            lambda: feature_engineer.get_training_data(start_gw, end_gw),
+        )
+        if X_train.empty:
+            logger.error("No training data available")
+            return None
 
     # Get features for prediction
-    X_pred = feature_engineer.get_player_features_for_gameweek(target_gw)
+    X_pred = _cached_frames(
+        data_version,
+        f"features_{target_gw}",
+        lambda: feature_engineer.get_player_features_for_gameweek(target_gw),
+    )
     if X_pred.empty:
         logger.error("No prediction features available")
         return None
 
+    # Map player IDs to Player objects, leaving out unavailable players:
+    # - status 'u' (unavailable), 'i' (injured), 's' (suspended), 'n' (not available)
+    # - chance_of_playing = 0
+    # This runs before predicting so the models only score players who can play
+    players = (
+        db.query(Player)
+        .filter(
+            Player.id.in_(X_pred["player_id"].tolist()),
+            or_(Player.status.is_(None), Player.status.notin_(UNAVAILABLE_STATUSES)),
+            or_(Player.chance_of_playing.is_(None), Player.chance_of_playing != 0),
+        )
+        .all()
+    )
+    player_map = {p.id: p for p in players}
+    excluded_count = len(X_pred) - len(player_map)
+    logger.info(f"Excluded {excluded_count} unavailable players from predictions")
+
+    X_pred = X_pred[X_pred["player_id"].isin(player_map)].reset_index(drop=True)
+    if X_pred.empty:
+        logger.error("No available players to predict")
+        return None
+
     # Make predictions based on model_type
     if model_type == "lgbm":
         # LightGBM only
-        lgbm_model = PointsPredictor()
-        metrics = lgbm_model.train(X_train, y_train)
+        lgbm_model, metrics = _train_or_load(X_train, y_train, target_gw)
         logger.info(f"LightGBM trained: CV MAE = {metrics['cv_mae']:.2f}")
         predicted_points = lgbm_model.predict(X_pred)
 
@@ -99,90 +354,89 @@ def generate_prediction(
 
     else:  # ensemble
         # Average of both models
-        lgbm_model = PointsPredictor()
-        metrics = lgbm_model.train(X_train, y_train)
+        # LightGBM releases the GIL while training, so the form model
+        # predicts on this thread meanwhile
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            lgbm_future = executor.submit(_train_or_load, X_train, y_train, target_gw)
+            simple_model = SimpleFormPredictor()
+            simple_preds = simple_model.predict(X_pred)
+            lgbm_model, metrics = lgbm_future.result()
         lgbm_preds = lgbm_model.predict(X_pred)
 
-        simple_model = SimpleFormPredictor()
-        simple_preds = simple_model.predict(X_pred)
-
-        # Weighted average: 40% LGBM, 60% simple (simple is more reliable currently)
-        predicted_points = 0.4 * lgbm_preds + 0.6 * simple_preds
+        # Weighted average: 40% LGBM, 60% simple (simple is more reliable currently),
+        # computed in the prediction buffers rather than in temporaries
+        np.multiply(lgbm_preds, 0.4, out=lgbm_preds)
+        np.multiply(simple_preds, 0.6, out=simple_preds)
+        predicted_points = np.add(lgbm_preds, simple_preds, out=lgbm_preds)
         logger.info(
             f"Ensemble model: LGBM CV MAE = {metrics['cv_mae']:.2f}, "
             f"weights = 40% LGBM + 60% Simple"
         )
 
-    X_pred["predicted_points"] = predicted_points
-
-    # Map player IDs to Player objects
-    player_ids = X_pred["player_id"].tolist()
-    players = db.query(Player).filter(Player.id.in_(player_ids)).all()
-    player_map = {p.id: p for p in players}
-
-    # Build prediction objects, filtering out unavailable players
-    predictions: list[PlayerPrediction] = []
-    excluded_count = 0
-    for _, row in X_pred.iterrows():
-        player = player_map.get(int(row["player_id"]))
-        if not player:
-            continue
-
-        # Skip unavailable players:
-        # - status 'u' (unavailable), 'i' (injured), 's' (suspended), 'n' (not available)
-        # - chance_of_playing = 0
-        if player.status in ("u", "i", "s", "n"):
-            excluded_count += 1
-            continue
-        if player.chance_of_playing is not None and player.chance_of_playing == 0:
-            excluded_count += 1
-            continue
-
-        predictions.append(
-            PlayerPrediction(
-                player_id=player.id,
-                player_fpl_id=player.fpl_id,
-                position=player.position,
-                predicted_points=row["predicted_points"],
-                web_name=player.web_name,
-            )
+    # Hand the solver parallel arrays of the available players; prediction
+    # objects are only built for the selected XI
+    available = list(
+        zip(
+            [player_map[player_id] for player_id in X_pred["player_id"].tolist()],
+            predicted_points.tolist(),
         )
-
-    logger.info(f"Excluded {excluded_count} unavailable players from predictions")
+    )
+    positions = np.array([player.position for player, _ in available], dtype="U3")
+    points_arr = np.array([points for _, points in available], dtype=np.float64)
 
     # Solve for optimal XI
-    selected_xi, formation = solve_formation(predictions)
+    selected_idx, formation = solve_formation_vec(positions, points_arr)
+    selected_xi = [
+        PlayerPrediction(
+            player_id=available[i][0].id,
+            player_fpl_id=available[i][0].fpl_id,
+            position=available[i][0].position,
+            predicted_points=available[i][1],
+            web_name=available[i][0].web_name,
+        )
+        for i in selected_idx
+    ]
 
     if not selected_xi:
         logger.error("Formation solver returned empty XI")
         return None
 
     # Calculate total predicted points (round the sum, not individual values)
-    total_points = round(sum(p.predicted_points for p in selected_xi))
+    xi_points = np.fromiter(
+        (p.predicted_points for p in selected_xi),
+        dtype=np.float64,
+        count=len(selected_xi),
+    )
+    total_points = round(float(xi_points.sum()))
 
     # Create prediction record with model type in version
-    model_version = f"{settings.model_version}-{model_type}"
     prediction = Prediction(
-        gameweek_id=target_gw_db.id,
-        model_version=model_version,
+        gameweek_id=target_gw_id,
+        model_version=MODEL_VERSIONS[model_type],
         total_predicted_points=total_points,
         formation=formation,
     )
     db.add(prediction)
     db.flush()
 
-    # Add prediction players
-    for slot, pp in enumerate(selected_xi, start=1):
-        pred_player = PredictionPlayer(
-            prediction_id=prediction.id,
-            player_id=pp.player_id,
-            position_slot=slot,
-            predicted_points=pp.predicted_points,
-            predicted_minutes=90.0,  # Simplified - assume full games
-            start_probability=0.95,  # Simplified
-            confidence=0.7,  # Simplified
-        )
-        db.add(pred_player)
+    # Add prediction players in one executemany rather than 11 unit-of-work adds
+    db.execute(
+        insert(PredictionPlayer),
+        [
+            {
+                "prediction_id": prediction.id,
+                "player_id": pp.player_id,
+                "position_slot": slot,
+                "predicted_points": round(points, 2),
+                "predicted_minutes": 90.0,  # Simplified - assume full games
+                "start_probability": 0.95,  # Simplified
+                "confidence": 0.7,  # Simplified
+            }
+            for slot, (pp, points) in enumerate(
+                zip(selected_xi, xi_points.tolist()), start=1
+            )
+        ],
+    )
 
     db.commit()
 
@@ -191,4 +445,6 @@ def generate_prediction(
         f"{formation} formation, {total_points} predicted points"
     )
 
-    return prediction
+    return GeneratedPrediction(
+        prediction=prediction, player_ids=[pp.player_id for pp in selected_xi]
+    )
@@ -2,16 +2,32 @@
 
 import asyncio
 import logging
-from difflib import SequenceMatcher
+import unicodedata
+from functools import lru_cache
 from typing import Any
 
+import numpy as np
+from rapidfuzz import fuzz, process
+from sqlalchemy import Float, Integer, column, select, update, values
 from sqlalchemy.orm import Session
 from understatapi import UnderstatClient
 
 from app.models import Player, PlayerGWStats
+from app.services.data_ingestion import UPSERT_BATCH_SIZE
 
 logger = logging.getLogger(__name__)
 
+# str.translate table deleting the combining diacritical marks (U+0300-U+036F)
+# that NFKD splits off accented Latin letters
+_COMBINING_MARKS = dict.fromkeys(range(0x0300, 0x0370))
+
+
+@lru_cache(maxsize=4096)
+def _normalize_name(name: str) -> str:
+    """Normalize player name for matching (accents stripped, lowercase)."""
+    normalized = unicodedata.normalize("NFKD", name).translate(_COMBINING_MARKS)
+    return normalized.lower().strip()
+
 
 class UnderstatSyncService:
     """Service to fetch and sync xG data from Understat."""
@@ -19,8 +35,8 @@ class UnderstatSyncService:
     def __init__(self, db: Session):
         self.db = db
         self.understat = UnderstatClient()
-        # Cache for player name matching
-        self._player_match_cache: dict[str, int | None] = {}
+        # Cache for player name matching (None: no match)
+        self._player_match_cache: dict[str, Player | None] = {}
 
     async def sync_xg_data(self, season: str = "2024") -> dict[str, Any]:
         """
@@ -42,19 +58,25 @@ class UnderstatSyncService:
         }
 
         try:
-            # Get all EPL players from Understat
-            league_data = await self._get_league_players(season)
+            # Get all EPL players from Understat, loading the FPL players to
+            # match them against while the request is in flight. The session
+            # is only used from the worker thread until both are done.
+            league_data, fpl_players = await asyncio.gather(
+                self._get_league_players(season),
+                asyncio.to_thread(lambda: self.db.query(Player).all()),
+            )
             logger.info(f"Fetched {len(league_data)} players from Understat")
+            fpl_by_name = {_normalize_name(p.web_name): p for p in fpl_players}
 
-            # Get FPL players for matching
-            fpl_players = self.db.query(Player).all()
-            fpl_by_name = {self._normalize_name(p.web_name): p for p in fpl_players}
-
-            # Also create alternative mappings by full name
+            # Also create alternative mappings by full name, without replacing
+            # another player's web name that normalizes the same
             for p in fpl_players:
                 if p.first_name and p.second_name:
                     full_name = f"{p.first_name} {p.second_name}"
-                    fpl_by_name[self._normalize_name(full_name)] = p
+                    fpl_by_name.setdefault(_normalize_name(full_name), p)
+
+            # Per-game xG/xA/npxG averages for each matched FPL player
+            per_game: dict[int, tuple[float, float, float]] = {}
 
             # Process each Understat player
             for us_player in league_data:
@@ -74,30 +96,17 @@ class UnderstatSyncService:
                     total_xa = float(us_player.get("xA", 0) or 0)
                     total_npxg = float(us_player.get("npxG", 0) or 0)
 
-                    xg_per_game = total_xg / games
-                    xa_per_game = total_xa / games
-                    npxg_per_game = total_npxg / games
-
-                    # Update all gameweek stats for this player with per-game averages
-                    player_stats = (
-                        self.db.query(PlayerGWStats)
-                        .filter(PlayerGWStats.player_id == fpl_player.id)
-                        .all()
+                    per_game[fpl_player.id] = (
+                        total_xg / games,
+                        total_xa / games,
+                        total_npxg / games,
                     )
 
-                    for stats in player_stats:
-                        # Scale xG by minutes played (per 90)
-                        minutes = stats.minutes or 0
-                        if minutes > 0:
-                            scale = minutes / 90.0
-                            stats.xg = round(xg_per_game * scale, 2)
-                            stats.xa = round(xa_per_game * scale, 2)
-                            stats.npxg = round(npxg_per_game * scale, 2)
-                            results["stats_updated"] += 1
-
                 except Exception as e:
                     results["errors"].append(f"Player {us_player.get('player_name')}: {e}")
 
+            results["stats_updated"] = self._apply_xg(per_game)
+
             self.db.commit()
 
         except Exception as e:
@@ -110,6 +119,74 @@ class UnderstatSyncService:
         )
         return results
 
+    def _apply_xg(self, per_game: dict[int, tuple[float, float, float]]) -> int:
+        """
+        Write per-game xG averages onto every gameweek each player played.
+
+        Averages are scaled by minutes played (per 90) for all appearances
+        at once.
+
+        Args:
+            per_game: Player ID -> per-game (xG, xA, npxG)
+
+        Returns:
+            Number of gameweek stats rows updated
+        """
+        if not per_game:
+            return 0
+        appearances = self.db.execute(
+            select(
+                PlayerGWStats.id, PlayerGWStats.player_id, PlayerGWStats.minutes
+            ).where(
+                PlayerGWStats.player_id.in_(per_game),
+                PlayerGWStats.minutes > 0,
+            )
+        ).all()
+        if not appearances:
+            return 0
+
+        stats_ids, player_ids, minutes = (np.array(col) for col in zip(*appearances))
+        averages = np.array([per_game[player_id] for player_id in player_ids.tolist()])
+        scaled = averages * (minutes / 90.0)[:, np.newaxis]
+
+        # (id, xg, xa, npxg) per appearance; Python's round() is correctly
+        # rounded, where np.round can land 0.01 off on halfway values
+        rows = [
+            (stats_id, round(xg, 2), round(xa, 2), round(npxg, 2))
+            for stats_id, (xg, xa, npxg) in zip(stats_ids.tolist(), scaled.tolist())
+        ]
+        for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+            self._update_xg(rows[start : start + UPSERT_BATCH_SIZE])
+        return len(rows)
+
+    def _update_xg(self, rows: list[tuple[int, float, float, float]]) -> None:
+        """Update xg/xa/npxg of gameweek stats by ID in a single statement."""
+        if self.db.get_bind().dialect.name != "postgresql":
+            # SQLite cannot alias VALUES columns, so fall back to an executemany
+            self.db.execute(
+                update(PlayerGWStats),
+                [
+                    {"id": stats_id, "xg": xg, "xa": xa, "npxg": npxg}
+                    for stats_id, xg, xa, npxg in rows
+                ],
+            )
+            return
+
+        # UPDATE ... FROM (VALUES ...) AS v(id, xg, xa, npxg)
+        new_values = values(
+            column("id", Integer),
+            column("xg", Float),
+            column("xa", Float),
+            column("npxg", Float),
+            name="v",
+        ).data(rows)
+        self.db.execute(
+            update(PlayerGWStats)
+            .where(PlayerGWStats.id == new_values.c.id)
+            .values(xg=new_values.c.xg, xa=new_values.c.xa, npxg=new_values.c.npxg)
+            .execution_options(synchronize_session=False)
+        )
+
     async def _get_league_players(self, season: str) -> list[dict]:
         """Get all EPL players from Understat."""
         try:
@@ -126,46 +203,30 @@ class UnderstatSyncService:
     ) -> Player | None:
         """Match Understat player to FPL player by name."""
         us_name = us_player.get("player_name", "")
-        normalized = self._normalize_name(us_name)
+        normalized = _normalize_name(us_name)
 
         # Check cache first
         if normalized in self._player_match_cache:
-            player_id = self._player_match_cache[normalized]
-            if player_id:
-                return self.db.query(Player).filter(Player.id == player_id).first()
-            return None
+            return self._player_match_cache[normalized]
 
         # Direct match
         if normalized in fpl_by_name:
             player = fpl_by_name[normalized]
-            self._player_match_cache[normalized] = player.id
+            self._player_match_cache[normalized] = player
             return player
 
-        # Fuzzy match
-        best_match = None
-        best_score = 0.0
-
-        for fpl_name, player in fpl_by_name.items():
-            score = SequenceMatcher(None, normalized, fpl_name).ratio()
-            if score > best_score and score > 0.85:
-                best_score = score
-                best_match = player
-
-        if best_match:
-            self._player_match_cache[normalized] = best_match.id
+        # Fuzzy match (best name scoring above 85/100)
+        match = process.extractOne(
+            normalized, fpl_by_name.keys(), scorer=fuzz.ratio, score_cutoff=85
+        )
+        if match and match[1] > 85:
+            best_match = fpl_by_name[match[0]]
+            self._player_match_cache[normalized] = best_match
             return best_match
 
         self._player_match_cache[normalized] = None
         return None
 
-    def _normalize_name(self, name: str) -> str:
-        """Normalize player name for matching."""
-        import unicodedata
-
-        normalized = unicodedata.normalize("NFKD", name)
-        normalized = "".join(c for c in normalized if not unicodedata.combining(c))
-        return normalized.lower().strip()
-
 
 def sync_understat_data(db: Session, season: str = "2024") -> dict[str, Any]:
     """
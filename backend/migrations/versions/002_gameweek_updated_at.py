@@ -0,0 +1,36 @@
+"""Add updated_at to gameweeks for cache versioning.
+
+Revision ID: 002_gameweek_updated_at
+Revises: 001_initial
+Create Date: 2026-10-15
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "002_gameweek_updated_at"
+down_revision: Union[str, None] = "001_initial"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add gameweeks.updated_at."""
+    op.add_column(
+        "gameweeks",
+        sa.Column(
+            "updated_at",
+            sa.DateTime(),
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Drop gameweeks.updated_at."""
+    op.drop_column("gameweeks", "updated_at")
@@ -0,0 +1,41 @@
+"""Add composite indexes for feature building and dream team lookups.
+
+Revision ID: 004_composite_indexes
+Revises: 003_sync_runs
+Create Date: 2026-10-15
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "004_composite_indexes"
+down_revision: Union[str, None] = "003_sync_runs"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create composite indexes."""
+    op.create_index(
+        "ix_player_gw_stats_gw_points",
+        "player_gw_stats",
+        ["gameweek_id", "total_points"],
+    )
+    op.create_index(
+        "ix_fixtures_gw_teams",
+        "fixtures",
+        ["gameweek_id", "team_home_id", "team_away_id"],
+    )
+    op.create_index(
+        "ix_dream_teams_gw_points", "dream_teams", ["gameweek_id", "points"]
+    )
+
+
+def downgrade() -> None:
+    """Drop composite indexes."""
+    op.drop_index("ix_dream_teams_gw_points", table_name="dream_teams")
+    op.drop_index("ix_fixtures_gw_teams", table_name="fixtures")
+    op.drop_index("ix_player_gw_stats_gw_points", table_name="player_gw_stats")
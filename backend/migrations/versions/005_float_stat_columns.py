@@ -0,0 +1,62 @@
+"""Store xG/xA/npxG and points ratio as floating point.
+
+Revision ID: 005_float_stat_columns
+Revises: 004_composite_indexes
+Create Date: 2026-10-15
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "005_float_stat_columns"
+down_revision: Union[str, None] = "004_composite_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_STAT_COLUMNS = ("xg", "xa", "npxg")
+
+
+def upgrade() -> None:
+    """Convert DECIMAL columns to DOUBLE PRECISION."""
+    for column in _STAT_COLUMNS:
+        op.alter_column(
+            "player_gw_stats",
+            column,
+            type_=sa.Float(),
+            existing_type=sa.DECIMAL(precision=5, scale=2),
+            existing_nullable=True,
+            postgresql_using=f"{column}::double precision",
+        )
+    op.alter_column(
+        "backtest_results",
+        "points_ratio",
+        type_=sa.Float(),
+        existing_type=sa.DECIMAL(precision=5, scale=4),
+        existing_nullable=False,
+        postgresql_using="points_ratio::double precision",
+    )
+
+
+def downgrade() -> None:
+    """Convert DOUBLE PRECISION columns back to DECIMAL."""
+    op.alter_column(
+        "backtest_results",
+        "points_ratio",
+        type_=sa.DECIMAL(precision=5, scale=4),
+        existing_type=sa.Float(),
+        existing_nullable=False,
+        postgresql_using="points_ratio::numeric(5, 4)",
+    )
+    for column in _STAT_COLUMNS:
+        op.alter_column(
+            "player_gw_stats",
+            column,
+            type_=sa.DECIMAL(precision=5, scale=2),
+            existing_type=sa.Float(),
+            existing_nullable=True,
+            postgresql_using=f"{column}::numeric(5, 2)",
+        )
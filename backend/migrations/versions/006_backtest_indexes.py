@@ -0,0 +1,35 @@
+"""Add composite indexes for backtest lookups.
+
+Revision ID: 006_backtest_indexes
+Revises: 005_float_stat_columns
+Create Date: 2026-10-15
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "006_backtest_indexes"
+down_revision: Union[str, None] = "005_float_stat_columns"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create composite indexes."""
+    op.create_index(
+        "ix_predictions_gw_version", "predictions", ["gameweek_id", "model_version"]
+    )
+    op.create_index(
+        "ix_prediction_players_pred_player",
+        "prediction_players",
+        ["prediction_id", "player_id"],
+    )
+
+
+def downgrade() -> None:
+    """Drop composite indexes."""
+    op.drop_index("ix_prediction_players_pred_player", table_name="prediction_players")
+    op.drop_index("ix_predictions_gw_version", table_name="predictions")
@@ -0,0 +1,52 @@
+"""Store prediction player points and probabilities as floating point.
+
+Revision ID: 007_float_prediction_columns
+Revises: 006_backtest_indexes
+Create Date: 2026-10-15
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "007_float_prediction_columns"
+down_revision: Union[str, None] = "006_backtest_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (column, DECIMAL precision, DECIMAL scale, nullable)
+_COLUMNS = (
+    ("predicted_points", 5, 2, False),
+    ("predicted_minutes", 5, 2, True),
+    ("start_probability", 3, 2, True),
+    ("confidence", 3, 2, True),
+)
+
+
+def upgrade() -> None:
+    """Convert DECIMAL columns to DOUBLE PRECISION."""
+    for column, precision, scale, nullable in _COLUMNS:
+        op.alter_column(
+            "prediction_players",
+            column,
+            type_=sa.Float(),
+            existing_type=sa.DECIMAL(precision=precision, scale=scale),
+            existing_nullable=nullable,
+            postgresql_using=f"{column}::double precision",
+        )
+
+
+def downgrade() -> None:
+    """Convert DOUBLE PRECISION columns back to DECIMAL."""
+    for column, precision, scale, nullable in _COLUMNS:
+        op.alter_column(
+            "prediction_players",
+            column,
+            type_=sa.DECIMAL(precision=precision, scale=scale),
+            existing_type=sa.Float(),
+            existing_nullable=nullable,
+            postgresql_using=f"{column}::numeric({precision}, {scale})",
+        )
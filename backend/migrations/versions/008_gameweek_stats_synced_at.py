@@ -0,0 +1,31 @@
+"""Add stats_synced_at to gameweeks for incremental syncs.
+
+Revision ID: 008_gameweek_stats_synced_at
+Revises: 007_float_prediction_columns
+Create Date: 2026-10-15
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "008_gameweek_stats_synced_at"
+down_revision: Union[str, None] = "007_float_prediction_columns"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add gameweeks.stats_synced_at."""
+    op.add_column(
+        "gameweeks",
+        sa.Column("stats_synced_at", sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Drop gameweeks.stats_synced_at."""
+    op.drop_column("gameweeks", "stats_synced_at")
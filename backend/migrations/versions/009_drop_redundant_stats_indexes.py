@@ -0,0 +1,31 @@
+"""Drop single-column player_gw_stats indexes covered by composite ones.
+
+Revision ID: 009_drop_redundant_stats_indexes
+Revises: 008_gameweek_stats_synced_at
+Create Date: 2026-10-15
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "009_drop_redundant_stats_indexes"
+down_revision: Union[str, None] = "008_gameweek_stats_synced_at"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Drop indexes on columns that lead a unique or composite index."""
+    op.drop_index("ix_player_gw_stats_player_id", table_name="player_gw_stats")
+    op.drop_index("ix_player_gw_stats_gameweek_id", table_name="player_gw_stats")
+
+
+def downgrade() -> None:
+    """Recreate the single-column indexes."""
+    op.create_index(
+        "ix_player_gw_stats_gameweek_id", "player_gw_stats", ["gameweek_id"]
+    )
+    op.create_index("ix_player_gw_stats_player_id", "player_gw_stats", ["player_id"])
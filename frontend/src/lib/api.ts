@@ -8,6 +8,7 @@ import type {
   Gameweek,
   Prediction,
   SyncResult,
+  SyncRun,
 } from "@/types";
 
 /**
@@ -95,10 +96,25 @@ export async function runBacktest(
 }
 
 // Sync
+const SYNC_POLL_INTERVAL_MS = 2000;
+
+export async function getSyncRun(runId: number): Promise<SyncRun> {
+  return fetchApi<SyncRun>(`/api/sync/runs/${runId}`);
+}
+
 export async function syncFplData(): Promise<SyncResult> {
-  return fetchApi<SyncResult>("/api/sync/fpl", {
+  // The sync runs in the background; poll its run until it finishes
+  let run = await fetchApi<SyncRun>("/api/sync/fpl", {
     method: "POST",
   });
+  while (run.status === "pending" || run.status === "running") {
+    await new Promise((resolve) => setTimeout(resolve, SYNC_POLL_INTERVAL_MS));
+    run = await getSyncRun(run.id);
+  }
+  if (run.status === "failed" || !run.result) {
+    throw new Error(`Sync failed: ${run.error ?? "unknown error"}`);
+  }
+  return run.result;
 }
 
 // Health
@@ -110,3 +110,13 @@ export interface SyncResult {
   player_stats: number;
   dream_teams: number;
 }
+
+export interface SyncRun {
+  id: number;
+  source: string;
+  status: "pending" | "running" | "completed" | "failed";
+  result: SyncResult | null;
+  error: string | null;
+  created_at: string;
+  finished_at: string | null;
+}